@@ -0,0 +1,424 @@
+'''
+Arena: partidas entre bots, sem interface, em um pool de processos.
+
+Cada partida opõe dois motores (A e B), alternando quem começa. Ao final, o
+relatório traz vitórias/empates/derrotas de A, com intervalos de confiança
+de Wilson (95%), e, para cada motor, os nós por segundo e os percentis da
+latência por jogada. Um nó é uma posição visitada pelo motor: as chamadas a
+make_move durante a busca, somadas ao contador próprio do que não passa por
+make_move (jogadas das simulações do RolloutEngine, nós do EndgameSolver,
+consultas à tabela do jogo da velha), divididas pelo tempo de busca. O
+resumo pode ser acrescentado a um arquivo JSON lines para acompanhar
+regressões.
+
+Jogos: 'connect_four' (BitboardConnectFour, mesmas regras de ConnectFour),
+'tic_tac_toe', 'quarto' e as variantes de KInARow em K_IN_A_ROW_GAMES.
+Motores e parâmetros (veja ENGINES):
+  random
+  mcts            iterations, time_limit, rollout ('random' | 'win_block', Connect Four)
+  minimax         depth, time_limit (Connect Four: aprofundamento iterativo se dado;
+                  KInARow: aprofundamento iterativo com game.evaluate),
+                  endgame (Quarto: solucionador exato no final)
+
+Uso:
+  python arena.py connect_four mcts:iterations=300,rollout=win_block minimax:depth=4 \\
+      --games 200 --workers 4 --output arena.jsonl
+'''
+import argparse
+import json
+import math
+import os
+import random
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+Q2 = os.path.join(HERE, 'q2')
+
+
+# (linhas, colunas, k, gravidade)
+K_IN_A_ROW_GAMES = {
+    'connect_four_8x8': (8, 8, 4, True),
+    'connect_four_9x9': (9, 9, 4, True),
+    'gomoku': (15, 15, 5, False),
+}
+
+
+def _quarto_modules():
+    # Os módulos do Quarto importam uns aos outros pelo nome, a partir de q2/
+    if Q2 not in sys.path:
+        sys.path.insert(0, Q2)
+
+
+# ----------------------
+# Jogos
+# ----------------------
+
+def _new_game(name):
+    if name == 'connect_four':
+        from connect_four_bitboard import BitboardConnectFour
+        return BitboardConnectFour()
+    if name == 'tic_tac_toe':
+        from tic_tac_toe import TicTacToe
+        return TicTacToe()
+    if name == 'quarto':
+        _quarto_modules()
+        from quarto_game import QuartoGame
+        game = QuartoGame()
+        game.select_next_piece(random.randrange(len(game.all_pieces)))
+        return game
+    if name in K_IN_A_ROW_GAMES:
+        from k_in_a_row import KInARow
+        return KInARow(*K_IN_A_ROW_GAMES[name])
+    raise ValueError(f"Jogo desconhecido: {name!r}")
+
+
+def _first_player(name):
+    return 0 if name == 'quarto' else 'X'
+
+
+def _over(name, game):
+    if name == 'quarto':
+        return game.check_win() or not game.available_moves() or game.selected_piece is None
+    return bool(game.game_over())
+
+
+def _play(name, game, move):
+    if name == 'quarto':
+        game.play_turn(move)
+    else:
+        game.make_move(move)
+
+
+def _winner(name, game):
+    '''Vencedor como jogador do jogo ('X'/'O' ou 0/1), ou None.'''
+    if name == 'quarto':
+        winner = game.winner()
+        return None if winner is None else (0 if winner == "Humano" else 1)
+    return game.winner()
+
+
+# ----------------------
+# Motores
+# ----------------------
+# Cada fábrica devolve (jogada, contador): jogada(game) escolhe o lance e
+# contador() é o total acumulado de nós visitados sem passar por make_move.
+
+def _no_extra_nodes():
+    return 0
+
+
+def _random_engine(name, params):
+    if name == 'quarto':
+        from quarto_bitboard import BitboardQuarto
+        return (lambda game: BitboardQuarto.from_game(game).random_move()), _no_extra_nodes
+    return (lambda game: random.choice(game.available_moves())), _no_extra_nodes
+
+
+def _mcts_engine(name, params):
+    iterations = int(params.get('iterations', 200))
+    time_limit = params.get('time_limit')
+    time_limit = float(time_limit) if time_limit is not None else None
+    if name == 'quarto':
+        from quarto_mcts import QuartoMCTSSearcher
+        return QuartoMCTSSearcher(iterations, time_limit), _no_extra_nodes
+    from mcts import MCTSSearcher, rollout
+    if name == 'connect_four' and 'rollout' in params:
+        from connect_four_rollout import RolloutEngine
+        # As simulações do RolloutEngine não usam make_move: conta as jogadas simuladas
+        engine = RolloutEngine(params['rollout'])
+        return MCTSSearcher(iterations, time_limit, engine), lambda: engine.plies
+    return MCTSSearcher(iterations, time_limit, rollout), _no_extra_nodes
+
+
+def _minimax_engine(name, params):
+    if name == 'tic_tac_toe':
+        from minimax import best_move
+        # A jogada vem de uma consulta à tabela (tic_tac_toe_db): um nó por jogada
+        lookups = [0]
+
+        def engine(game):
+            lookups[0] += 1
+            return best_move(game)
+        return engine, lambda: lookups[0]
+    if name == 'quarto':
+        from quarto_minimax import best_move_quarto, DEFAULT_DEPTH
+        depth = int(params.get('depth', DEFAULT_DEPTH))
+        engine = lambda game: best_move_quarto(game, depth)
+        if params.get('endgame'):
+            from quarto_endgame import EndgameSolver, with_endgame
+            solver = EndgameSolver()
+            return with_endgame(engine, solver=solver), lambda: solver.total_nodes
+        return engine, _no_extra_nodes
+    from minimax import iterative_deepening
+    if name in K_IN_A_ROW_GAMES:
+        # Avaliação incremental do próprio jogo (evaluate_fn=None)
+        depth = params.get('depth')
+        time_limit = float(params.get('time_limit', 1.0))
+        return (lambda game: iterative_deepening(game, None, time_limit,
+                                                 int(depth) if depth is not None else None)), _no_extra_nodes
+    from play_connect_four_minimax_with_hef import best_move, evaluate_connect_four
+    from connect_four_eval import evaluate_connect_four_batch
+    from transposition_table import TranspositionTable
+    table = TranspositionTable()
+    if 'time_limit' in params:
+        depth = params.get('depth')
+        return (lambda game: iterative_deepening(
+            game, evaluate_connect_four, float(params['time_limit']),
+            int(depth) if depth is not None else None, table, evaluate_connect_four_batch)), _no_extra_nodes
+    depth = int(params.get('depth', 4))
+    return (lambda game: best_move(game, depth, table)), _no_extra_nodes
+
+
+ENGINES = {
+    'random': _random_engine,
+    'mcts': _mcts_engine,
+    'minimax': _minimax_engine,
+}
+
+
+def _positive_int(value):
+    value = int(value)
+    if value <= 0:
+        raise ValueError("deve ser positivo")
+    return value
+
+
+def _positive_float(value):
+    value = float(value)
+    if value <= 0:
+        raise ValueError("deve ser positivo")
+    return value
+
+
+def _rollout_policy(value):
+    from connect_four_rollout import POLICIES
+    if value not in POLICIES:
+        raise ValueError(f"opções: {', '.join(POLICIES)}")
+    return value
+
+
+def _flag(value):
+    if value.lower() not in ('', '1', 'true', '0', 'false'):
+        raise ValueError("use 1/true ou 0/false")
+    return value.lower() in ('', '1', 'true')
+
+
+# Parâmetros aceitos por cada motor e a conversão (com validação) de cada valor
+ENGINE_PARAMS = {
+    'random': {},
+    'mcts': {'iterations': _positive_int, 'time_limit': _positive_float, 'rollout': _rollout_policy},
+    'minimax': {'depth': _positive_int, 'time_limit': _positive_float, 'endgame': _flag},
+}
+
+
+def parse_engine(spec):
+    '''
+    Converte 'nome:chave=valor,chave=valor' em {'name': nome, 'params': {...}},
+    com os valores já convertidos. Levanta ValueError para motores, parâmetros
+    ou valores desconhecidos, antes de qualquer partida começar.
+    '''
+    name, _, rest = spec.partition(':')
+    if name not in ENGINES:
+        raise ValueError(f"Motor desconhecido: {name!r}. Opções: {', '.join(ENGINES)}")
+    accepted = ENGINE_PARAMS[name]
+    params = {}
+    for item in filter(None, rest.split(',')):
+        key, _, value = item.partition('=')
+        if key not in accepted:
+            options = ', '.join(accepted) or 'nenhum'
+            raise ValueError(f"Parâmetro desconhecido para {name}: {key!r}. Opções: {options}")
+        try:
+            params[key] = accepted[key](value)
+        except ValueError as e:
+            raise ValueError(f"Valor inválido para {name}:{key}: {value!r} ({e})") from None
+    return {'name': name, 'params': params}
+
+
+# ----------------------
+# Contagem de nós
+# ----------------------
+
+# Chamadas a make_move no processo; o trabalho fora de make_move vem do contador de cada motor
+_nodes = [0]
+
+
+def _count_make_move(cls):
+    original = cls.make_move
+
+    def make_move(self, *args):
+        _nodes[0] += 1
+        return original(self, *args)
+    cls.make_move = make_move
+
+
+def _init_worker():
+    # Cada processo conta as chamadas a make_move de todas as classes de jogo
+    from connect_four import ConnectFour
+    from connect_four_bitboard import BitboardConnectFour
+    from tic_tac_toe import TicTacToe
+    from k_in_a_row import KInARow
+    _quarto_modules()
+    from quarto_game import QuartoGame
+    from quarto_bitboard import BitboardQuarto
+    for cls in (ConnectFour, BitboardConnectFour, TicTacToe, KInARow, QuartoGame, BitboardQuarto):
+        _count_make_move(cls)
+
+
+# ----------------------
+# Partidas
+# ----------------------
+
+def play_game(game_name, engine_a, engine_b, a_first, seed):
+    '''
+    Joga uma partida e devolve {'result': 'A' | 'B' | 'draw', 'moves': n,
+    'stats': {'A': ..., 'B': ...}}, com os nós e as latências de cada motor.
+    '''
+    random.seed(seed)
+    if game_name == 'quarto':
+        _quarto_modules()
+    game = _new_game(game_name)
+    engines = {
+        'A': ENGINES[engine_a['name']](game_name, engine_a['params']),
+        'B': ENGINES[engine_b['name']](game_name, engine_b['params']),
+    }
+    first = _first_player(game_name)
+    side_of = {first: 'A' if a_first else 'B'}
+    stats = {side: {'nodes': 0, 'latencies': []} for side in engines}
+
+    while not _over(game_name, game):
+        side = side_of.get(game.current, 'B' if side_of[first] == 'A' else 'A')
+        choose, extra_nodes = engines[side]
+        nodes_before = _nodes[0] + extra_nodes()
+        start = time.perf_counter()
+        move = choose(game)
+        stats[side]['latencies'].append(time.perf_counter() - start)
+        stats[side]['nodes'] += _nodes[0] + extra_nodes() - nodes_before
+        if move is None:
+            break
+        _play(game_name, game, move)
+
+    winner = _winner(game_name, game)
+    if winner is None:
+        result = 'draw'
+    else:
+        result = side_of.get(winner, 'B' if side_of[first] == 'A' else 'A')
+    return {'result': result, 'moves': len(game.history), 'stats': stats}
+
+
+def wilson_interval(successes, n, z=1.96):
+    '''Intervalo de confiança de Wilson para uma proporção.'''
+    if n == 0:
+        return (0.0, 1.0)
+    p = successes / n
+    denom = 1 + z * z / n
+    center = (p + z * z / (2 * n)) / denom
+    half = z * math.sqrt(p * (1 - p) / n + z * z / (4 * n * n)) / denom
+    return (max(0.0, center - half), min(1.0, center + half))
+
+
+def percentile(values, q):
+    '''Percentil q (0-100) por interpolação linear.'''
+    if not values:
+        return None
+    values = sorted(values)
+    pos = (len(values) - 1) * q / 100
+    low = int(pos)
+    high = min(low + 1, len(values) - 1)
+    return values[low] + (values[high] - values[low]) * (pos - low)
+
+
+def summarize(game_name, engine_a, engine_b, games):
+    n = len(games)
+    counts = {key: sum(g['result'] == key for g in games) for key in ('A', 'B', 'draw')}
+    summary = {
+        'game': game_name,
+        'engine_a': engine_a,
+        'engine_b': engine_b,
+        'games': n,
+        'wins': counts['A'],
+        'draws': counts['draw'],
+        'losses': counts['B'],
+        'win_rate': counts['A'] / n if n else 0.0,
+        'draw_rate': counts['draw'] / n if n else 0.0,
+        'loss_rate': counts['B'] / n if n else 0.0,
+        'win_ci95': wilson_interval(counts['A'], n),
+        'draw_ci95': wilson_interval(counts['draw'], n),
+        'loss_ci95': wilson_interval(counts['B'], n),
+        'mean_moves': sum(g['moves'] for g in games) / n if n else 0.0,
+    }
+    for side in ('A', 'B'):
+        latencies = [t for g in games for t in g['stats'][side]['latencies']]
+        nodes = sum(g['stats'][side]['nodes'] for g in games)
+        think = sum(latencies)
+        summary[f'engine_{side.lower()}_perf'] = {
+            'moves': len(latencies),
+            'nodes': nodes,
+            'nodes_per_second': nodes / think if think else 0.0,
+            'latency_p50': percentile(latencies, 50),
+            'latency_p90': percentile(latencies, 90),
+            'latency_p99': percentile(latencies, 99),
+            'latency_max': max(latencies) if latencies else None,
+        }
+    return summary
+
+
+def run_match(game_name, engine_a, engine_b, games=100, workers=None, seed=0, output=None):
+    '''
+    Joga `games` partidas entre engine_a e engine_b (dicts de parse_engine),
+    alternando quem começa, e devolve o resumo. Se `output` for dado, o
+    resumo é acrescentado ao arquivo como uma linha JSON.
+    '''
+    rng = random.Random(seed)
+    seeds = [rng.randrange(2**32) for _ in range(games)]
+    if game_name == 'tic_tac_toe' and 'minimax' in (engine_a['name'], engine_b['name']):
+        # A tabela do jogo da velha é gerada uma vez aqui, e não por cada processo
+        # no primeiro lance (o que contaria na latência do motor)
+        from tic_tac_toe_db import ensure_database
+        ensure_database()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as executor:
+        futures = [executor.submit(play_game, game_name, engine_a, engine_b, i % 2 == 0, s)
+                   for i, s in enumerate(seeds)]
+        results = [f.result() for f in futures]
+    summary = summarize(game_name, engine_a, engine_b, results)
+    summary['timestamp'] = time.strftime('%Y-%m-%dT%H:%M:%S')
+    if output:
+        with open(output, 'a') as f:
+            f.write(json.dumps(summary) + '\n')
+    return summary
+
+
+def print_summary(summary):
+    a, b = summary['engine_a'], summary['engine_b']
+    print(f"{summary['game']}: A = {a['name']} {a['params']}  x  B = {b['name']} {b['params']}")
+    print(f"{summary['games']} partidas, {summary['mean_moves']:.1f} jogadas em média")
+    for label, key in (('Vitórias de A', 'win'), ('Empates', 'draw'), ('Derrotas de A', 'loss')):
+        low, high = summary[f'{key}_ci95']
+        print(f"  {label:<14} {summary[f'{key}_rate']:6.1%}  (IC 95%: {low:.1%} - {high:.1%})")
+    for side in ('a', 'b'):
+        perf = summary[f'engine_{side}_perf']
+        if not perf['moves']:
+            continue
+        print(f"  Motor {side.upper()}: {perf['nodes_per_second']:,.0f} nós/s, latência "
+              f"p50 {perf['latency_p50'] * 1000:.1f} ms, p90 {perf['latency_p90'] * 1000:.1f} ms, "
+              f"p99 {perf['latency_p99'] * 1000:.1f} ms")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Partidas entre bots, sem interface.")
+    parser.add_argument('game', choices=['connect_four', 'tic_tac_toe', 'quarto', *K_IN_A_ROW_GAMES])
+    parser.add_argument('engine_a', help="Ex.: mcts:iterations=300,rollout=win_block")
+    parser.add_argument('engine_b', help="Ex.: minimax:depth=4")
+    parser.add_argument('--games', type=int, default=100)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--output', help="Arquivo JSON lines em que o resumo é acrescentado")
+    args = parser.parse_args()
+
+    try:
+        engine_a, engine_b = parse_engine(args.engine_a), parse_engine(args.engine_b)
+    except ValueError as e:
+        parser.error(str(e))
+    summary = run_match(args.game, engine_a, engine_b, args.games, args.workers, args.seed, args.output)
+    print_summary(summary)
@@ -4,6 +4,8 @@ class BoardGame:
         self.cols = cols
         self.board = [[' '] * cols for _ in range(rows)]
         self.current = 'X'
+        # Pilha de jogadas feitas, usada por undo_move()
+        self.history = []
 
     def available_moves(self):
         raise NotImplementedError
@@ -11,6 +13,14 @@ class BoardGame:
     def make_move(self, move):
         raise NotImplementedError
 
+    def undo_move(self):
+        '''
+        Desfaz a última jogada registrada em self.history, restaurando o
+        tabuleiro e o jogador atual. Permite que as buscas alterem um único
+        tabuleiro (make_move / undo_move) em vez de copiá-lo a cada nó.
+        '''
+        raise NotImplementedError
+
     def winner(self):
         raise NotImplementedError
 
@@ -21,9 +31,11 @@ class BoardGame:
         return self.winner() or self.full()
 
     def copy(self):
-        new = self.__class__()
+        # Não chama self.__class__(): subclasses podem ter parâmetros no construtor
+        new = self.__class__.__new__(self.__class__)
+        new.__dict__.update(self.__dict__)
         new.board = [row.copy() for row in self.board]
-        new.current = self.current
+        new.history = self.history.copy()
         return new
 
     def print_board(self):
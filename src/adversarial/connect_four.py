@@ -1,11 +1,16 @@
 from board_game import BoardGame
+from transposition_table import zobrist_keys
 import numpy as np
 
 ROWS, COLS = 6, 7
+# Chaves de Zobrist indexadas por [r * COLS + c][0 = 'X', 1 = 'O']
+ZOBRIST = zobrist_keys(ROWS * COLS)
 
 class ConnectFour(BoardGame):
     def __init__(self):
         super().__init__(6, 7)
+        # Hash de Zobrist da posição, atualizado a cada jogada
+        self.hash = 0
 
     def available_moves(self):
         return [c for c in range(self.cols) if self.board[0][c] == ' ']
@@ -14,10 +19,31 @@ class ConnectFour(BoardGame):
         for r in range(self.rows-1, -1, -1):
             if self.board[r][col] == ' ':
                 self.board[r][col] = self.current
+                self.hash ^= ZOBRIST[r * self.cols + col][self.current == 'O']
                 self.current = 'O' if self.current == 'X' else 'X'
+                self.history.append(col)
                 return True
         return False
 
+    def undo_move(self):
+        col = self.history.pop()
+        for r in range(self.rows):
+            if self.board[r][col] != ' ':
+                self.hash ^= ZOBRIST[r * self.cols + col][self.board[r][col] == 'O']
+                self.board[r][col] = ' '
+                break
+        self.current = 'O' if self.current == 'X' else 'X'
+
+    def to_array(self):
+        '''Tabuleiro como array int8 (linha 0 no topo): 1 = 'X', -1 = 'O', 0 = vazio.'''
+        return np.array([[1 if cell == 'X' else -1 if cell == 'O' else 0 for cell in row]
+                         for row in self.board], dtype=np.int8)
+
+    def copy(self):
+        new = super().copy()
+        new.hash = self.hash
+        return new
+
     def winner(self):
         b = self.board
         for r in range(self.rows):
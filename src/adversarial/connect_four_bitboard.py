@@ -0,0 +1,143 @@
+import numpy as np
+
+from board_game import BoardGame
+from connect_four import ROWS, COLS
+from transposition_table import zobrist_keys
+
+# Cada coluna ocupa ROWS + 1 bits (o bit extra no topo é sentinela e nunca é
+# ocupado), de baixo para cima: o bit da linha r (0 = base) na coluna c é
+# c * H1 + r. Com 6x7 são 49 bits, o que cabe em um inteiro de 64 bits.
+H1 = ROWS + 1
+# Deslocamentos das quatro direções: vertical, horizontal e as duas diagonais
+DIRECTIONS = (1, H1, H1 - 1, H1 + 1)
+# Bit de cada casa do tabuleiro achatado (linha 0 no topo), usado por to_array()
+CELL_BITS = np.array([c * H1 + (ROWS - 1 - r) for r in range(ROWS) for c in range(COLS)],
+                     dtype=np.uint64)
+# Chaves de Zobrist indexadas por [bit][0 = 'X', 1 = 'O']
+ZOBRIST = zobrist_keys(COLS * H1)
+
+
+class BitboardConnectFour(BoardGame):
+    """
+    Connect Four representado por dois bitboards (um por jogador) e pelas
+    alturas de cada coluna.
+
+    Mantém a mesma API de ConnectFour (available_moves, make_move, winner,
+    full, copy), mas a jogada é O(1), a cópia não percorre o tabuleiro e a
+    detecção de vitória usa deslocamentos e ANDs apenas sobre as linhas que
+    passam pela última peça colocada.
+    """
+    def __init__(self):
+        self.rows = ROWS
+        self.cols = COLS
+        self.current = 'X'
+        # bitboards[0] = peças de 'X', bitboards[1] = peças de 'O'
+        self.bitboards = [0, 0]
+        # Próximo bit livre de cada coluna
+        self.heights = [c * H1 for c in range(COLS)]
+        self.moves_played = 0
+        self.history = []
+        # Hash de Zobrist da posição, atualizado a cada jogada
+        self.hash = 0
+        self._winner = None
+        # Número de jogadas no momento em que a vitória ocorreu (para undo_move)
+        self._winner_ply = None
+
+    @property
+    def board(self):
+        """Tabuleiro no formato lista de listas (linha 0 = topo), para exibição e heurísticas."""
+        x, o = self.bitboards
+        board = [[' '] * self.cols for _ in range(self.rows)]
+        for c in range(self.cols):
+            for r in range(self.rows):
+                bit = 1 << (c * H1 + r)
+                if x & bit:
+                    board[self.rows - 1 - r][c] = 'X'
+                elif o & bit:
+                    board[self.rows - 1 - r][c] = 'O'
+        return board
+
+    def to_array(self):
+        '''Tabuleiro como array int8 (linha 0 no topo): 1 = 'X', -1 = 'O', 0 = vazio.'''
+        x, o = self.bitboards
+        cells = ((np.uint64(x) >> CELL_BITS) & np.uint64(1)).astype(np.int8)
+        cells -= ((np.uint64(o) >> CELL_BITS) & np.uint64(1)).astype(np.int8)
+        return cells.reshape(self.rows, self.cols)
+
+    def available_moves(self):
+        return [c for c in range(self.cols) if self.heights[c] - c * H1 < ROWS]
+
+    def make_move(self, col):
+        if self.heights[col] - col * H1 >= ROWS:
+            return False
+        player = 0 if self.current == 'X' else 1
+        bit = 1 << self.heights[col]
+        self.bitboards[player] |= bit
+        self.hash ^= ZOBRIST[self.heights[col]][player]
+        self.heights[col] += 1
+        self.moves_played += 1
+        self.history.append(col)
+        if self._winner is None and self._wins_through(self.bitboards[player], bit):
+            self._winner = self.current
+            self._winner_ply = self.moves_played
+        self.current = 'O' if self.current == 'X' else 'X'
+        return True
+
+    def undo_move(self):
+        col = self.history.pop()
+        self.current = 'O' if self.current == 'X' else 'X'
+        player = 0 if self.current == 'X' else 1
+        self.heights[col] -= 1
+        self.bitboards[player] &= ~(1 << self.heights[col])
+        self.hash ^= ZOBRIST[self.heights[col]][player]
+        if self._winner_ply == self.moves_played:
+            self._winner = None
+            self._winner_ply = None
+        self.moves_played -= 1
+
+    def _wins_through(self, bitboard, bit):
+        # Para cada direção, conta as peças contíguas do jogador dos dois
+        # lados da peça recém-colocada (no máximo 3 deslocamentos por lado).
+        for shift in DIRECTIONS:
+            count = 0
+            probe = bit
+            for _ in range(3):
+                probe >>= shift
+                if not bitboard & probe:
+                    break
+                count += 1
+            probe = bit
+            for _ in range(3):
+                probe <<= shift
+                if not bitboard & probe:
+                    break
+                count += 1
+            if count >= 3:
+                return True
+        return False
+
+    def winner(self):
+        return self._winner
+
+    def full(self):
+        return self.moves_played == self.rows * self.cols
+
+    def copy(self):
+        # Mantém a classe de subclasses, como BoardGame.copy
+        cls = type(self)
+        new = cls.__new__(cls)
+        if cls is not BitboardConnectFour:
+            # Subclasses podem ter outros atributos: copia todos antes
+            # (__dict__.update custa o dobro das atribuições abaixo)
+            new.__dict__.update(self.__dict__)
+        new.rows = self.rows
+        new.cols = self.cols
+        new.current = self.current
+        new.bitboards = self.bitboards[:]
+        new.heights = self.heights[:]
+        new.moves_played = self.moves_played
+        new.history = self.history.copy()
+        new.hash = self.hash
+        new._winner = self._winner
+        new._winner_ply = self._winner_ply
+        return new
@@ -0,0 +1,79 @@
+'''
+Versão vetorizada (NumPy) da função de avaliação heurística do Connect Four
+(evaluate_connect_four em play_connect_four_minimax_with_hef.py), com os
+mesmos valores.
+
+O tabuleiro é um array int8 (ROWS, COLS), linha 0 no topo, com 1 para 'X',
+-1 para 'O' e 0 para vazio (veja game.to_array()). As 69 janelas de 4 casas
+são pré-computadas como índices no tabuleiro achatado, de modo que contar as
+peças do jogador, do oponente e as casas vazias de todas as janelas é uma
+indexação e uma soma.
+'''
+import numpy as np
+
+from connect_four import ROWS, COLS
+
+
+def _window_indices():
+    windows = []
+    for r in range(ROWS):
+        for c in range(COLS - 3):
+            windows.append([r * COLS + c + i for i in range(4)])  # horizontais
+    for r in range(ROWS - 3):
+        for c in range(COLS):
+            windows.append([(r + i) * COLS + c for i in range(4)])  # verticais
+    for r in range(ROWS - 3):
+        for c in range(COLS - 3):
+            windows.append([(r + i) * COLS + c + i for i in range(4)])  # diagonais \
+    for r in range(3, ROWS):
+        for c in range(COLS - 3):
+            windows.append([(r - i) * COLS + c + i for i in range(4)])  # diagonais /
+    return np.array(windows, dtype=np.intp)
+
+
+WINDOWS = _window_indices()
+
+# Cada casa é codificada como 0 (vazia), 1 (jogador) ou 5 (oponente). A soma
+# de uma janela, p + 5 * o, identifica sem ambiguidade quantas peças do jogador
+# (p) e do oponente (o) ela contém, e SCORE_TABLE dá o valor da janela.
+SCORE_TABLE = np.zeros(25, dtype=np.int64)
+SCORE_TABLE[4] = 1000           # 4 do jogador
+SCORE_TABLE[3] = 50             # 3 do jogador e 1 vazia
+SCORE_TABLE[2] = 10             # 2 do jogador e 2 vazias
+SCORE_TABLE[3 * 5] = -80        # 3 do oponente e 1 vazia
+
+# Código de cada valor de casa (-1, 0, 1), indexado por valor + 1
+_CODES = {
+    'X': np.array([5, 0, 1], dtype=np.int8),
+    'O': np.array([1, 0, 5], dtype=np.int8),
+}
+
+
+def board_to_array(board):
+    '''Converte um tabuleiro lista de listas (' ', 'X', 'O') em array int8.'''
+    return np.array([[1 if cell == 'X' else -1 if cell == 'O' else 0 for cell in row]
+                     for row in board], dtype=np.int8)
+
+
+def evaluate_connect_four_batch(boards, player):
+    '''
+    Avalia vários tabuleiros de uma só vez.
+
+    :param boards: Array int8 com formato (N, ROWS, COLS) ou (N, ROWS * COLS).
+    :param player: O jogador do ponto de vista da avaliação ('X' ou 'O').
+    :return: Array (N,) com a pontuação heurística de cada tabuleiro.
+    '''
+    boards = np.asarray(boards, dtype=np.int8).reshape(-1, ROWS * COLS)
+    codes = _CODES[player][boards + 1]
+    sums = codes[:, WINDOWS].sum(axis=2)
+    return SCORE_TABLE[sums].sum(axis=1)
+
+
+def evaluate_connect_four_np(board, player):
+    '''
+    Mesma interface de evaluate_connect_four: recebe o tabuleiro (lista de
+    listas ou array int8) e o jogador, e devolve a pontuação.
+    '''
+    if not isinstance(board, np.ndarray):
+        board = board_to_array(board)
+    return int(evaluate_connect_four_batch(board[np.newaxis], player)[0])
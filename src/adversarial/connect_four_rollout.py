@@ -0,0 +1,160 @@
+'''
+Motor de simulações (rollouts) do MCTS para o Connect Four.
+
+A simulação trabalha diretamente sobre inteiros copiados de um
+BitboardConnectFour (dois bitboards, alturas das colunas e o número de
+jogadas), sem make_move/undo_move: a lista de colunas livres é mantida
+incrementalmente e o teste de fim de jogo olha só o bitboard de quem acabou
+de jogar, com deslocamentos em quatro direções, em tempo constante.
+
+A política que escolhe a coluna de cada jogada é plugável (veja POLICIES) e
+cada folha pode receber um lote de simulações, cuja média é propagada.
+'''
+import random
+import time
+
+from connect_four import ROWS, COLS
+from connect_four_bitboard import H1, DIRECTIONS
+
+CELLS = ROWS * COLS
+# Bit sentinela no topo de cada coluna: a coluna está cheia quando a altura chega nele
+TOPS = tuple(c * H1 + ROWS for c in range(COLS))
+
+
+def has_four(bitboard):
+    '''Verifica se o bitboard tem 4 peças alinhadas em alguma direção.'''
+    for shift in DIRECTIONS:
+        pairs = bitboard & (bitboard >> shift)
+        if pairs & (pairs >> 2 * shift):
+            return True
+    return False
+
+
+# Políticas: recebem o bitboard de quem joga, o do oponente, as alturas e as
+# colunas livres, e devolvem a coluna escolhida.
+
+def random_policy(own, other, heights, legal):
+    return random.choice(legal)
+
+
+def winning_cells(bitboard):
+    '''
+    Casas que completariam 4 em linha para o dono do bitboard, em todas as
+    direções de uma vez. Pode incluir casas ocupadas ou fora do tabuleiro;
+    quem chama deve filtrar com as casas jogáveis.
+    '''
+    # Vertical: só é possível completar por cima
+    cells = (bitboard << 1) & (bitboard << 2) & (bitboard << 3)
+    for shift in DIRECTIONS[1:]:
+        pair = (bitboard << shift) & (bitboard << 2 * shift)
+        cells |= pair & (bitboard << 3 * shift)
+        cells |= pair & (bitboard >> shift)
+        pair = (bitboard >> shift) & (bitboard >> 2 * shift)
+        cells |= pair & (bitboard << shift)
+        cells |= pair & (bitboard >> 3 * shift)
+    return cells
+
+
+def win_block_policy(own, other, heights, legal):
+    '''Vence imediatamente se possível; senão bloqueia a vitória imediata do oponente.'''
+    playable = 0
+    for col in legal:
+        playable |= 1 << heights[col]
+    threats = winning_cells(own) & playable or winning_cells(other) & playable
+    if threats:
+        return ((threats & -threats).bit_length() - 1) // H1
+    return random.choice(legal)
+
+
+POLICIES = {
+    'random': random_policy,
+    'win_block': win_block_policy,
+}
+
+
+def playout(bitboards, heights, player, moves_played, policy=random_policy):
+    '''
+    Joga a partida até o fim a partir do estado dado, sem alterá-lo.
+
+    :param player: Índice de quem joga (0 = 'X', 1 = 'O').
+    :return: (resultado do ponto de vista de X (+1, -1 ou 0), jogadas simuladas).
+    '''
+    start = moves_played
+    boards = list(bitboards)
+    heights = list(heights)
+    legal = [c for c in range(COLS) if heights[c] < TOPS[c]]
+    while moves_played < CELLS:
+        col = policy(boards[player], boards[1 - player], heights, legal)
+        boards[player] |= 1 << heights[col]
+        heights[col] += 1
+        moves_played += 1
+        if heights[col] == TOPS[col]:
+            legal.remove(col)
+        if has_four(boards[player]):
+            return (1 if player == 0 else -1), moves_played - start
+        player ^= 1
+    return 0, moves_played - start
+
+
+class RolloutEngine:
+    '''
+    Simulações para o MCTS com a mesma interface de mcts.rollout: recebe um
+    BitboardConnectFour e devolve (resultado do ponto de vista de X, jogadas
+    a desfazer). O jogo não é alterado, então são sempre 0 jogadas; o
+    resultado é a média de `rollouts_per_leaf` simulações.
+
+    Conta as simulações feitas, as jogadas simuladas (plies) e o tempo gasto
+    nelas (rollouts_per_second).
+    '''
+    def __init__(self, policy='random', rollouts_per_leaf=1):
+        self.policy = POLICIES[policy] if isinstance(policy, str) else policy
+        self.rollouts_per_leaf = rollouts_per_leaf
+        self.rollouts = 0
+        self.plies = 0
+        self.elapsed = 0.0
+
+    def __call__(self, game):
+        winner = game.winner()
+        if winner is not None:
+            return (1 if winner == 'X' else -1), 0
+        if game.full():
+            return 0, 0
+        start = time.perf_counter()
+        player = 0 if game.current == 'X' else 1
+        total = 0
+        for _ in range(self.rollouts_per_leaf):
+            result, plies = playout(game.bitboards, game.heights, player, game.moves_played, self.policy)
+            total += result
+            self.plies += plies
+        self.elapsed += time.perf_counter() - start
+        self.rollouts += self.rollouts_per_leaf
+        return total / self.rollouts_per_leaf, 0
+
+    @property
+    def rollouts_per_second(self):
+        return self.rollouts / self.elapsed if self.elapsed else 0.0
+
+    def reset_stats(self):
+        self.rollouts = 0
+        self.plies = 0
+        self.elapsed = 0.0
+
+
+if __name__ == '__main__':
+    # Compara a vazão das simulações a partir do tabuleiro vazio
+    from connect_four_bitboard import BitboardConnectFour
+    from mcts import rollout
+
+    game = BitboardConnectFour()
+    n = 2000
+    start = time.perf_counter()
+    for _ in range(n):
+        _, plies = rollout(game)
+        for _ in range(plies):
+            game.undo_move()
+    print(f"mcts.rollout (make/undo): {n / (time.perf_counter() - start):,.0f} rollouts/s")
+    for name in POLICIES:
+        engine = RolloutEngine(name)
+        for _ in range(n):
+            engine(game)
+        print(f"RolloutEngine({name!r}): {engine.rollouts_per_second:,.0f} rollouts/s")
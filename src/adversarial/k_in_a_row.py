@@ -0,0 +1,157 @@
+from board_game import BoardGame
+from transposition_table import zobrist_keys
+
+
+def window_weight(n):
+    '''Peso de uma janela com n peças de um só jogador (e nenhuma do outro), para n < k.'''
+    return 10 ** min(n - 1, 3) if n else 0
+
+
+# Chaves de Zobrist por tamanho de tabuleiro, compartilhadas entre instâncias
+_ZOBRIST = {}
+
+
+class KInARow(BoardGame):
+    """
+    Jogo de k em linha em um tabuleiro rows x cols, com ou sem gravidade:
+    KInARow(6, 7, 4, gravity=True) tem as regras do Connect Four,
+    KInARow(3, 3, 3) as do jogo da velha e KInARow(15, 15, 5) as do gomoku.
+
+    Com gravidade a jogada é a coluna; sem gravidade, a casa (linha, coluna).
+
+    Todas as janelas de k casas (horizontais, verticais e diagonais) são
+    pré-computadas, junto com as janelas que passam por cada casa. A jogada
+    atualiza apenas as contagens de peças dessas janelas (no máximo 4k), e
+    com elas a detecção de vitória e a pontuação heurística, que ficam
+    O(k) por jogada em vez de O(tabuleiro).
+    """
+    def __init__(self, rows=6, cols=7, k=4, gravity=True):
+        super().__init__(rows, cols)
+        self.k = k
+        self.gravity = gravity
+        self.windows, self.cell_windows = self._build_windows(rows, cols, k)
+        self.contributions = self._contributions(k)
+        # Peças de 'X' e de 'O' em cada janela
+        self.counts = {'X': [0] * len(self.windows), 'O': [0] * len(self.windows)}
+        # Pontuação heurística do ponto de vista de 'X', mantida a cada jogada
+        self.score = 0
+        # Casas livres por coluna (com gravidade)
+        self.heights = [0] * cols
+        self.moves_played = 0
+        self._winner = None
+        self._winner_ply = None
+        if (rows, cols) not in _ZOBRIST:
+            _ZOBRIST[rows, cols] = zobrist_keys(rows * cols)
+        self.zobrist = _ZOBRIST[rows, cols]
+        self.hash = 0
+
+    @staticmethod
+    def _build_windows(rows, cols, k):
+        windows = []
+        for r in range(rows):
+            for c in range(cols):
+                for dr, dc in ((0, 1), (1, 0), (1, 1), (1, -1)):
+                    end_r, end_c = r + dr * (k - 1), c + dc * (k - 1)
+                    if 0 <= end_r < rows and 0 <= end_c < cols:
+                        windows.append([(r + dr * i) * cols + c + dc * i for i in range(k)])
+        cell_windows = [[] for _ in range(rows * cols)]
+        for w, window in enumerate(windows):
+            for cell in window:
+                cell_windows[cell].append(w)
+        return windows, cell_windows
+
+    def available_moves(self):
+        if self.gravity:
+            return [c for c in range(self.cols) if self.heights[c] < self.rows]
+        return [(r, c) for r in range(self.rows) for c in range(self.cols) if self.board[r][c] == ' ']
+
+    def _cell(self, move):
+        if self.gravity:
+            if self.heights[move] >= self.rows:
+                return None
+            return self.rows - 1 - self.heights[move], move
+        r, c = move
+        return (r, c) if self.board[r][c] == ' ' else None
+
+    @staticmethod
+    def _contributions(k):
+        # Valor de uma janela, do ponto de vista de 'X', indexado por x * (k + 1) + o.
+        # Janelas completas não pontuam: a vitória é tratada à parte.
+        table = []
+        for x in range(k + 1):
+            for o in range(k + 1):
+                if o == 0 and x < k:
+                    table.append(window_weight(x))
+                elif x == 0 and o < k:
+                    table.append(-window_weight(o))
+                else:
+                    table.append(0)
+        return table
+
+    def _update(self, cell, player, delta):
+        # Soma delta às contagens do jogador nas janelas da casa e corrige a
+        # pontuação. Devolve True se alguma janela ficou completa.
+        xs, os_ = self.counts['X'], self.counts['O']
+        own = xs if player == 'X' else os_
+        table, k1 = self.contributions, self.k + 1
+        won = False
+        for w in self.cell_windows[cell]:
+            before = table[xs[w] * k1 + os_[w]]
+            own[w] += delta
+            self.score += table[xs[w] * k1 + os_[w]] - before
+            if own[w] == self.k:
+                won = True
+        return won
+
+    def make_move(self, move):
+        cell = self._cell(move)
+        if cell is None:
+            return False
+        r, c = cell
+        player = self.current
+        self.board[r][c] = player
+        if self.gravity:
+            self.heights[c] += 1
+        index = r * self.cols + c
+        self.hash ^= self.zobrist[index][player == 'O']
+        self.moves_played += 1
+        self.history.append(move)
+        if self._update(index, player, 1) and self._winner is None:
+            self._winner = player
+            self._winner_ply = self.moves_played
+        self.current = 'O' if player == 'X' else 'X'
+        return True
+
+    def undo_move(self):
+        move = self.history.pop()
+        self.current = 'O' if self.current == 'X' else 'X'
+        player = self.current
+        if self.gravity:
+            self.heights[move] -= 1
+            r, c = self.rows - 1 - self.heights[move], move
+        else:
+            r, c = move
+        self.board[r][c] = ' '
+        index = r * self.cols + c
+        self.hash ^= self.zobrist[index][player == 'O']
+        self._update(index, player, -1)
+        if self._winner_ply == self.moves_played:
+            self._winner = None
+            self._winner_ply = None
+        self.moves_played -= 1
+
+    def winner(self):
+        return self._winner
+
+    def full(self):
+        return self.moves_played == self.rows * self.cols
+
+    def evaluate(self, player):
+        '''Pontuação heurística do ponto de vista de `player`, mantida incrementalmente.'''
+        return self.score if player == 'X' else -self.score
+
+    def copy(self):
+        new = super().copy()
+        new.counts = {'X': self.counts['X'].copy(), 'O': self.counts['O'].copy()}
+        new.heights = self.heights.copy()
+        return new
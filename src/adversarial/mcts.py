@@ -1,20 +1,22 @@
 import math
 import random
+import time
 
 class MCTSNode:
     '''
         This class represents a node in the tree generated when executing the Monte Carlo Tree Search (MCTS) algorithm.
-        Each node corresponds to a game state and contains information about the game,
-        the moves available from that state, and the results of simulations from that state.
+        Each node corresponds to a game state and contains information about
+        the moves available from that state and the results of simulations from that state.
         The node keeps track of its parent, the move that led to it, the number of visits,
         the number of wins, and the children nodes that can be reached from it.
+        The game state itself is not stored: the search replays the moves on a single board.
     '''
     def __init__(self, game, parent=None, move=None):
         '''
             Initialize the MCTSNode with the current game state, parent node, and move that led to this state.
             Also initializes the list of untried moves from this state.
         '''
-        self.game = game
+        self.current = game.current
         self.parent = parent
         self.move = move
         self.children = []
@@ -47,9 +49,10 @@ class MCTSNode:
         # Otherwise, we select the child with the highest UCB1 value
         return max(self.children, key=lambda child: child.ucb1())
 
-    def expand(self):
+    def expand(self, game):
         '''
             Expand the node by creating a new child node for one of the untried moves.
+            The move is played on `game`, which must be in the state of this node.
             This function is used during the expansion phase of MCTS to add a new node to the tree.
         '''
         # If there are no untried moves, we cannot expand
@@ -60,9 +63,8 @@ class MCTSNode:
         # to select the move (e.g., based on heuristics or other criteria)
         move = self.untried_moves.pop()
 
-        new_game = self.game.copy()
-        new_game.make_move(move)
-        child = MCTSNode(new_game, parent=self, move=move)
+        game.make_move(move)
+        child = MCTSNode(game, parent=self, move=move)
         self.children.append(child)
         return child
 
@@ -77,41 +79,132 @@ class MCTSNode:
         self.visits += 1
         self.wins += result
 
-def mcts(game, iterations=200):
-    root = MCTSNode(game)
+def rollout(game):
+    '''
+        Play random moves on `game` (in place) until the game is over.
+        Returns the result from X's point of view (+1 X wins, -1 O wins, 0 draw)
+        and the number of plies played, so the caller can undo them.
+    '''
+    plies = 0
+    while not game.game_over():
+        move = random.choice(game.available_moves())
+        game.make_move(move)
+        plies += 1
+
+    winner = game.winner()
+    if winner == 'X':
+        result = 1
+    elif winner == 'O':
+        result = -1
+    else:
+        result = 0
+    return result, plies
+
+def backpropagate(node, result):
+    '''
+        Update the statistics of `node` and all its ancestors with a simulation result
+        given from X's point of view.
+    '''
+    while node is not None:
+        perspective = 1 if node.current == 'O' else -1
+        node.update(perspective * result)
+        node = node.parent
+
+def search_tree(game, iterations=200, time_limit=None, rollout_fn=rollout):
+    '''
+        Run MCTS from `game` for `iterations` iterations (or until `time_limit` seconds
+        have passed, if given) and return the root node of the search tree.
+        `rollout_fn` plays out a position; it has the interface of rollout()
+        (see connect_four_rollout.RolloutEngine for a faster, pluggable one).
+    '''
+    # A single copy of the game is mutated with make_move/undo_move
+    game_sim = game.copy()
+    root = MCTSNode(game_sim)
+    run_iterations(root, game_sim, iterations, time_limit, rollout_fn)
+    return root
+
+def run_iterations(root, game_sim, iterations, time_limit=None, rollout_fn=rollout):
+    '''
+        Run MCTS iterations on an existing tree. `game_sim` must be in the state of `root`;
+        it is mutated during the search and restored before returning.
+    '''
+    start_time = time.time()
 
     for _ in range(iterations):
+        if time_limit is not None and time.time() - start_time > time_limit:
+            break
         node = root
-        game_sim = game.copy()
+        plies = 0
 
         # Selection
         while node.untried_moves == [] and node.children:
             node = node.select_child()
             game_sim.make_move(node.move)
+            plies += 1
 
         # Expansion
         if node.untried_moves:
-            node = node.expand()
-            game_sim = node.game.copy()
+            node = node.expand(game_sim)
+            plies += 1
 
         # Simulation
-        while not game_sim.game_over():
-            move = random.choice(game_sim.available_moves())
-            game_sim.make_move(move)
+        result, rollout_plies = rollout_fn(game_sim)
+        plies += rollout_plies
 
         # Backpropagation
-        winner = game_sim.winner()
-        if winner == 'X':
-            result = 1
-        elif winner == 'O':
-            result = -1
-        else:
-            result = 0
-
-        while node is not None:
-            perspective = 1 if node.game.current == 'O' else -1
-            node.update(perspective * result)
-            node = node.parent
+        backpropagate(node, result)
+
+        # Restore the root state
+        for _ in range(plies):
+            game_sim.undo_move()
 
+def mcts(game, iterations=200, time_limit=None, rollout_fn=rollout):
+    root = search_tree(game, iterations, time_limit, rollout_fn)
     best_child = max(root.children, key=lambda c: c.visits)
     return best_child.move
+
+class MCTSSearcher:
+    '''
+        MCTS that keeps its tree between moves of the same game.
+        On each call to search(game), the root is advanced along the moves played since the
+        previous search (read from game.history, so the opponent's reply is included).
+        The subtree under the new root keeps its statistics and the sibling branches,
+        which can no longer be reached, are dropped. If the position cannot be reached from
+        the previous root (e.g. a new game), the tree is rebuilt from scratch.
+    '''
+    def __init__(self, iterations=200, time_limit=None, rollout_fn=rollout):
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.rollout_fn = rollout_fn
+        self.root = None
+        self.game = None
+
+    def advance(self, game):
+        '''
+            Move the root to the position of `game`. Returns False if it is not reachable.
+        '''
+        if self.root is None:
+            return False
+        done = len(self.game.history)
+        if game.history[:done] != self.game.history:
+            return False
+        for move in game.history[done:]:
+            child = next((c for c in self.root.children if c.move == move), None)
+            if child is None:
+                return False
+            self.game.make_move(move)
+            # Detach the new root so the old root and its other branches can be freed
+            child.parent = None
+            self.root = child
+        return self.game.board == game.board and self.game.current == game.current
+
+    def search(self, game):
+        if not self.advance(game):
+            self.game = game.copy()
+            self.root = MCTSNode(self.game)
+        run_iterations(self.root, self.game, self.iterations, self.time_limit, self.rollout_fn)
+        best_child = max(self.root.children, key=lambda c: c.visits)
+        return best_child.move
+
+    def __call__(self, game):
+        return self.search(game)
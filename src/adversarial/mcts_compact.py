@@ -0,0 +1,181 @@
+'''
+MCTS com a árvore guardada em arrays NumPy pré-alocados, em vez de um objeto
+MCTSNode (com listas de filhos e de jogadas não tentadas) por nó.
+
+Cada nó é um índice. Os arrays guardam visitas, vitórias, pai, jogada (como
+índice em uma lista de jogadas distintas), primeiro filho e número de filhos,
+além do sinal do jogador que fez a jogada que leva ao nó. Os filhos de um nó
+são alocados todos de uma vez, em posições contíguas, de modo que a seleção
+calcula o UCB1 de todos os filhos com uma única operação vetorizada.
+
+Os estados não são guardados: a cada iteração as jogadas do caminho são
+refeitas a partir da raiz em uma única cópia do jogo e desfeitas ao final.
+'''
+import math
+import random
+import time
+
+import numpy as np
+
+from mcts import rollout
+
+
+class NodeView:
+    '''Acesso a um nó da árvore compacta com a mesma leitura de um MCTSNode.'''
+    __slots__ = ('tree', 'index')
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    @property
+    def visits(self):
+        return int(self.tree.visits[self.index])
+
+    @property
+    def wins(self):
+        return float(self.tree.wins[self.index])
+
+    @property
+    def move(self):
+        move_id = self.tree.move[self.index]
+        return None if move_id < 0 else self.tree.moves[move_id]
+
+    @property
+    def parent(self):
+        parent = self.tree.parent[self.index]
+        return None if parent < 0 else NodeView(self.tree, parent)
+
+    @property
+    def children(self):
+        first = self.tree.first_child[self.index]
+        if first < 0:
+            return []
+        return [NodeView(self.tree, i) for i in range(first, first + self.tree.num_children[self.index])]
+
+
+class CompactTree:
+    '''
+    Árvore de busca em arrays paralelos. O nó 0 é a raiz. Um nó ainda não
+    expandido tem first_child == -1; um nó terminal expandido tem 0 filhos.
+    Os arrays dobram de tamanho quando a capacidade acaba.
+    '''
+    def __init__(self, capacity=1 << 12):
+        self.size = 1
+        self.visits = np.zeros(capacity, dtype=np.float64)
+        self.wins = np.zeros(capacity, dtype=np.float64)
+        self.parent = np.full(capacity, -1, dtype=np.int32)
+        self.move = np.full(capacity, -1, dtype=np.int32)
+        self.first_child = np.full(capacity, -1, dtype=np.int32)
+        self.num_children = np.zeros(capacity, dtype=np.int32)
+        # +1 se quem jogou para chegar ao nó foi 'X', -1 se foi 'O'
+        self.perspective = np.zeros(capacity, dtype=np.int8)
+        self.moves = []
+        self._move_ids = {}
+
+    @property
+    def root(self):
+        return NodeView(self, 0)
+
+    def _grow(self, needed):
+        capacity = len(self.visits)
+        while capacity < needed:
+            capacity *= 2
+        for name, fill in (('visits', 0), ('wins', 0), ('parent', -1), ('move', -1),
+                           ('first_child', -1), ('num_children', 0), ('perspective', 0)):
+            old = getattr(self, name)
+            new = np.full(capacity, fill, dtype=old.dtype)
+            new[:len(old)] = old
+            setattr(self, name, new)
+
+    def _move_id(self, move):
+        move_id = self._move_ids.get(move)
+        if move_id is None:
+            move_id = self._move_ids[move] = len(self.moves)
+            self.moves.append(move)
+        return move_id
+
+    def expand(self, node, game):
+        '''Aloca todos os filhos de `node`; `game` deve estar no estado do nó.'''
+        moves = [] if game.game_over() else game.available_moves()
+        random.shuffle(moves)
+        first, count = self.size, len(moves)
+        if first + count > len(self.visits):
+            self._grow(first + count)
+        end = first + count
+        self.parent[first:end] = node
+        self.move[first:end] = [self._move_id(move) for move in moves]
+        self.perspective[first:end] = 1 if game.current == 'X' else -1
+        self.first_child[node] = first
+        self.num_children[node] = count
+        self.size = end
+
+    def select_child(self, node, c=math.sqrt(2)):
+        '''Filho de `node` com maior UCB1; filhos nunca visitados vêm primeiro.'''
+        first = self.first_child[node]
+        end = first + self.num_children[node]
+        visits = self.visits[first:end]
+        unvisited = np.flatnonzero(visits == 0)
+        if len(unvisited):
+            return first + int(unvisited[0])
+        ucb = self.wins[first:end] / visits + c * np.sqrt(math.log(self.visits[node]) / visits)
+        return first + int(np.argmax(ucb))
+
+    def backpropagate(self, path, result):
+        '''Atualiza os nós de `path` com um resultado do ponto de vista de X.'''
+        self.visits[path] += 1
+        self.wins[path] += self.perspective[path] * result
+
+    def best_move(self):
+        first = self.first_child[0]
+        if first < 0 or self.num_children[0] == 0:
+            return None
+        best = first + int(np.argmax(self.visits[first:first + self.num_children[0]]))
+        return self.moves[self.move[best]]
+
+
+def compact_search_tree(game, iterations=200, time_limit=None, capacity=1 << 12):
+    '''
+    Executa o MCTS a partir de `game` e devolve a CompactTree resultante.
+    Mesmo algoritmo de mcts.search_tree, com a árvore em arrays.
+    '''
+    game_sim = game.copy()
+    tree = CompactTree(capacity)
+    start_time = time.time()
+
+    for _ in range(iterations):
+        if time_limit is not None and time.time() - start_time > time_limit:
+            break
+        node = 0
+        path = [0]
+
+        # Seleção: desce pelos nós já expandidos refazendo as jogadas
+        while tree.first_child[node] >= 0 and tree.num_children[node]:
+            node = tree.select_child(node)
+            game_sim.make_move(tree.moves[tree.move[node]])
+            path.append(node)
+
+        # Expansão: um nó já simulado uma vez tem seus filhos alocados e a
+        # busca desce para o primeiro deles (ainda não visitado)
+        if tree.first_child[node] < 0 and (node == 0 or tree.visits[node] > 0):
+            tree.expand(node, game_sim)
+            if tree.num_children[node]:
+                node = int(tree.first_child[node])
+                game_sim.make_move(tree.moves[tree.move[node]])
+                path.append(node)
+
+        # Simulação
+        result, plies = rollout(game_sim)
+
+        # Retropropagação, de uma vez para todo o caminho
+        tree.backpropagate(path, result)
+
+        # Volta ao estado da raiz
+        for _ in range(plies + len(path) - 1):
+            game_sim.undo_move()
+
+    return tree
+
+
+def compact_mcts(game, iterations=200, time_limit=None, capacity=1 << 12):
+    return compact_search_tree(game, iterations, time_limit, capacity).best_move()
@@ -1,3 +1,7 @@
+import time
+
+from transposition_table import EXACT, LOWER, UPPER, TranspositionTable
+
 def minimax(game, maximizing):
     """
     Implementa o algoritmo Minimax para encontrar o valor de utilidade de um estado do jogo.
@@ -26,29 +30,41 @@ def minimax(game, maximizing):
     if maximizing:
         best = float('-inf')
         for move in game.available_moves():
-            new_game = game.copy()
-            new_game.make_move(move)
-            score = minimax(new_game, False)
+            game.make_move(move)
+            score = minimax(game, False)
+            game.undo_move()
             best = max(best, score)
         return best
     else:
         best = float('inf')
         for move in game.available_moves():
-            new_game = game.copy()
-            new_game.make_move(move)
-            score = minimax(new_game, True)
+            game.make_move(move)
+            score = minimax(game, True)
+            game.undo_move()
             best = min(best, score)
         return best
 
 def best_move(game):
+    if type(game).__name__ == 'TicTacToe':
+        # Jogo da velha: a jogada perfeita já está na tabela (tic_tac_toe_db)
+        from tic_tac_toe import TicTacToe
+        from tic_tac_toe_db import lookup_best_move
+        if type(game) is TicTacToe:
+            move = lookup_best_move(game)
+            # Posição fora da tabela (jogo não terminado): busca normalmente
+            if move is not None or game.game_over():
+                return move
+
     player = game.current
     best_val = float('-inf') if player == 'X' else float('inf')
     best_action = None
 
+    # Uma única cópia: a busca altera o tabuleiro com make_move/undo_move
+    game = game.copy()
     for move in game.available_moves():
-        new_game = game.copy()
-        new_game.make_move(move)
-        val = minimax(new_game, maximizing=(player == 'O'))
+        game.make_move(move)
+        val = minimax(game, maximizing=(player == 'O'))
+        game.undo_move()
 
         if (player == 'X' and val > best_val) or (player == 'O' and val < best_val):
             best_val = val
@@ -70,31 +86,209 @@ Quanto maior o valor, melhor o estado para o jogador atual.
 :param depth: Profundidade da busca Minimax.
 :param maximizing: Indica se o jogador atual está tentando maximizar (True) ou minimizar (False) o valor.
 :param player: O jogador atual ('X' ou 'O').
-:param evaluate_fn: Função de avaliação heurística que avalia o estado do jogo.
+:param evaluate_fn: Função de avaliação heurística que avalia o estado do jogo. Se for None,
+                    usa game.evaluate(player) (jogos com avaliação incremental, como KInARow).
+:param alpha: Limite inferior da janela alfa-beta (melhor valor já garantido para o maximizador).
+:param beta: Limite superior da janela alfa-beta (melhor valor já garantido para o minimizador).
+:param table: TranspositionTable opcional, indexada por game.hash (Zobrist). Guarda profundidade,
+              valor, tipo de limite (exato/inferior/superior) e melhor jogada de cada posição já
+              buscada. Como os valores são do ponto de vista de `player`, a tabela deve ser usada
+              por um único jogador e uma única função de avaliação.
+:param ordering: MoveOrdering opcional (jogadas killer e heurística de histórico).
+:param deadline: Instante (time.perf_counter()) a partir do qual a busca é interrompida com
+                 SearchTimeout. Nesse caso o jogo fica no meio da busca: use uma cópia.
+:param batch_evaluate_fn: Versão em lote de evaluate_fn, opcional. Recebe a lista de tabuleiros
+                          (game.to_array()) e o jogador e devolve um array de pontuações. Quando
+                          informada, os nós de profundidade 1 avaliam todas as folhas filhas em
+                          uma única chamada em vez de uma chamada por folha.
 :return: Valor numérico representando a qualidade do estado do jogo. 
 '''
-def minimax_with_hef(game, depth, maximizing, player, evaluate_fn):
+
+def minimax_with_hef(game, depth, maximizing, player, evaluate_fn,
+                     alpha=float('-inf'), beta=float('inf'), table=None,
+                     ordering=None, deadline=None, batch_evaluate_fn=None):
+    if deadline is not None and time.perf_counter() > deadline:
+        raise SearchTimeout()
     winner = game.winner()
     if winner == player:
         return 10000
     elif winner and winner != player:
         return -10000
     elif game.full() or depth == 0:
+        if evaluate_fn is None:
+            return game.evaluate(player)
         return evaluate_fn(game.board, player)
 
-    if maximizing:
+    alpha_orig, beta_orig = alpha, beta
+    moves = game.available_moves()
+    entry_move = None
+    if table is not None:
+        entry = table.lookup(game.hash)
+        if entry is not None:
+            _, entry_depth, score, flag, entry_move, _ = entry
+            if entry_depth >= depth:
+                if flag == EXACT:
+                    return score
+                elif flag == LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+    if ordering is not None:
+        moves = ordering.order(moves, len(game.history), entry_move)
+    elif entry_move in moves:
+        # A melhor jogada guardada é testada primeiro
+        moves.remove(entry_move)
+        moves.insert(0, entry_move)
+
+    best_move = None
+    if depth == 1 and batch_evaluate_fn is not None:
+        # Todos os filhos são folhas: avalia os não terminais em uma única chamada
+        scores = [None] * len(moves)
+        leaves, leaf_index = [], []
+        for i, move in enumerate(moves):
+            game.make_move(move)
+            winner = game.winner()
+            if winner:
+                scores[i] = 10000 if winner == player else -10000
+            else:
+                leaves.append(game.to_array())
+                leaf_index.append(i)
+            game.undo_move()
+        if leaves:
+            for i, score in zip(leaf_index, batch_evaluate_fn(leaves, player).tolist()):
+                scores[i] = score
+        pick = max if maximizing else min
+        best, best_move = pick(zip(scores, moves), key=lambda item: item[0])
+    elif maximizing:
         best = float('-inf')
-        for move in game.available_moves():
-            new_game = game.copy()
-            new_game.make_move(move)
-            val = minimax_with_hef(new_game, depth - 1, False, player, evaluate_fn)
-            best = max(best, val)
-        return best
+        for move in moves:
+            game.make_move(move)
+            val = minimax_with_hef(game, depth - 1, False, player, evaluate_fn,
+                                   alpha, beta, table, ordering, deadline, batch_evaluate_fn)
+            game.undo_move()
+            if val > best:
+                best, best_move = val, move
+            alpha = max(alpha, val)
+            if beta <= alpha:
+                if ordering is not None:
+                    ordering.cutoff(move, len(game.history), depth)
+                break
     else:
         best = float('inf')
-        for move in game.available_moves():
-            new_game = game.copy()
-            new_game.make_move(move)
-            val = minimax_with_hef(new_game, depth - 1, True, player, evaluate_fn)
-            best = min(best, val)
-        return best
+        for move in moves:
+            game.make_move(move)
+            val = minimax_with_hef(game, depth - 1, True, player, evaluate_fn,
+                                   alpha, beta, table, ordering, deadline, batch_evaluate_fn)
+            game.undo_move()
+            if val < best:
+                best, best_move = val, move
+            beta = min(beta, val)
+            if beta <= alpha:
+                if ordering is not None:
+                    ordering.cutoff(move, len(game.history), depth)
+                break
+
+    if table is not None:
+        if best <= alpha_orig:
+            flag = UPPER
+        elif best >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(game.hash, depth, best, flag, best_move)
+    return best
+
+
+class SearchTimeout(Exception):
+    """Lançada por minimax_with_hef quando o prazo (deadline) da busca se esgota."""
+    pass
+
+
+class MoveOrdering:
+    '''
+    Ordenação de jogadas para a poda alfa-beta.
+
+    A ordem é: jogada da variante principal (a melhor jogada guardada na tabela
+    de transposição), depois as jogadas killer da mesma profundidade (jogadas
+    que causaram corte em posições irmãs) e por fim as demais, da maior para a
+    menor pontuação na heurística de histórico.
+    '''
+    def __init__(self, killers_per_ply=2):
+        self.killers_per_ply = killers_per_ply
+        self.killers = {}
+        self.history = {}
+
+    def order(self, moves, ply, pv_move=None):
+        killers = self.killers.get(ply, [])
+        first = [m for m in [pv_move] + killers if m in moves]
+        first = list(dict.fromkeys(first))
+        rest = [m for m in moves if m not in first]
+        rest.sort(key=lambda m: self.history.get(m, 0), reverse=True)
+        return first + rest
+
+    def cutoff(self, move, ply, depth):
+        killers = self.killers.setdefault(ply, [])
+        if move not in killers:
+            killers.insert(0, move)
+            del killers[self.killers_per_ply:]
+        self.history[move] = self.history.get(move, 0) + depth * depth
+
+
+def iterative_deepening(game, evaluate_fn, time_limit=0.2, max_depth=None, table=None,
+                        batch_evaluate_fn=None):
+    '''
+    Busca alfa-beta com aprofundamento iterativo e limite de tempo, construída
+    sobre minimax_with_hef.
+
+    Busca com profundidade 1, 2, 3, ... até esgotar `time_limit` segundos e
+    devolve a melhor jogada da última profundidade completada. Cada iteração
+    reaproveita a iteração anterior: a variante principal vem da tabela de
+    transposição e as jogadas killer e o histórico vêm de MoveOrdering. A
+    profundidade 1 sempre é completada, para que haja uma jogada a devolver.
+
+    :param game: Instância do jogo com o estado atual do tabuleiro (não é alterada).
+    :param evaluate_fn: Função de avaliação heurística, como em minimax_with_hef.
+    :param time_limit: Tempo máximo da busca, em segundos.
+    :param max_depth: Profundidade máxima (padrão: número de casas vazias).
+    :param table: TranspositionTable opcional, que pode ser mantida entre jogadas.
+    :param batch_evaluate_fn: Versão em lote de evaluate_fn, opcional (veja minimax_with_hef).
+    :return: A melhor jogada encontrada.
+    '''
+    deadline = time.perf_counter() + time_limit
+    game = game.copy()
+    player = game.current
+    if table is None:
+        table = TranspositionTable()
+    table.new_search()
+    ordering = MoveOrdering()
+    if max_depth is None:
+        max_depth = game.rows * game.cols - len(game.history)
+
+    root_moves = game.available_moves()
+    if not root_moves:
+        return None
+    best = root_moves[0]
+    for depth in range(1, max_depth + 1):
+        depth_deadline = None if depth == 1 else deadline
+        best_score = float('-inf')
+        depth_best = None
+        try:
+            for move in root_moves:
+                game.make_move(move)
+                score = minimax_with_hef(game, depth - 1, False, player, evaluate_fn,
+                                         best_score, float('inf'), table, ordering, depth_deadline,
+                                         batch_evaluate_fn)
+                game.undo_move()
+                if score > best_score:
+                    best_score, depth_best = score, move
+        except SearchTimeout:
+            break
+        best = depth_best
+        # A melhor jogada desta profundidade abre a próxima iteração
+        root_moves.remove(best)
+        root_moves.insert(0, best)
+        if abs(best_score) >= 10000:
+            break # Vitória ou derrota forçada: buscar mais fundo não muda a jogada
+    return best
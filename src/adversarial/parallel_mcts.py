@@ -0,0 +1,159 @@
+'''
+MCTS paralelo usando um pool de processos (o GIL impede ganho com threads).
+
+Dois modos:
+  - 'root' (paralelização na raiz): cada processo constrói a sua própria
+    árvore a partir da mesma posição; as visitas dos filhos da raiz são
+    somadas e a jogada mais visitada é escolhida.
+  - 'leaf' (paralelização nas folhas, em lote): o processo principal mantém
+    uma única árvore, seleciona um lote de folhas usando perda virtual
+    (virtual loss) para que as seleções do mesmo lote se espalhem pela
+    árvore, e os processos fazem as simulações dessas folhas.
+'''
+
+import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from mcts import MCTSNode, rollout, backpropagate, search_tree
+
+
+def _rollout_stats(rollout_fn):
+    '''
+    Contadores (simulações, jogadas, segundos) de um RolloutEngine, ou None
+    para funções que não contam nada (como mcts.rollout).
+    '''
+    if not hasattr(rollout_fn, 'rollouts'):
+        return None
+    return rollout_fn.rollouts, rollout_fn.plies, rollout_fn.elapsed
+
+
+def _worker_stats(rollout_fn, before):
+    # O processo recebe uma cópia do motor com os contadores do pai: devolve só o acréscimo
+    after = _rollout_stats(rollout_fn)
+    if after is None:
+        return None
+    return tuple(a - b for a, b in zip(after, before))
+
+
+def _merge_stats(rollout_fn, stats):
+    # Soma nos contadores do motor do processo principal o que um processo contou
+    if stats is None:
+        return
+    rollouts, plies, elapsed = stats
+    rollout_fn.rollouts += rollouts
+    rollout_fn.plies += plies
+    rollout_fn.elapsed += elapsed
+
+
+def _root_worker(game, iterations, time_limit, seed, rollout_fn):
+    random.seed(seed)
+    before = _rollout_stats(rollout_fn)
+    root = search_tree(game, iterations, time_limit, rollout_fn)
+    children = [(child.move, child.visits, child.wins) for child in root.children]
+    return children, _worker_stats(rollout_fn, before)
+
+
+def _leaf_worker(game, rollouts, rollout_fn):
+    # Soma dos resultados (ponto de vista de X) de várias simulações da mesma folha
+    before = _rollout_stats(rollout_fn)
+    total = 0
+    for _ in range(rollouts):
+        result, plies = rollout_fn(game)
+        total += result
+        for _ in range(plies):
+            game.undo_move()
+    return total, _worker_stats(rollout_fn, before)
+
+
+def _root_parallel(executor, game, workers, iterations, time_limit, rollout_fn):
+    seeds = [random.randrange(2**32) for _ in range(workers)]
+    futures = [executor.submit(_root_worker, game, iterations, time_limit, seed, rollout_fn)
+               for seed in seeds]
+    visits = {}
+    for future in futures:
+        children, stats = future.result()
+        _merge_stats(rollout_fn, stats)
+        for move, child_visits, _ in children:
+            visits[move] = visits.get(move, 0) + child_visits
+    return max(visits, key=visits.get)
+
+
+def _apply_virtual_loss(node, amount):
+    while node is not None:
+        node.visits += amount
+        node.wins -= amount
+        node = node.parent
+
+
+def _leaf_parallel(executor, game, workers, iterations, time_limit, rollouts_per_leaf, rollout_fn):
+    game_sim = game.copy()
+    root = MCTSNode(game_sim)
+    start_time = time.time()
+    done = 0
+
+    while done < iterations:
+        if time_limit is not None and time.time() - start_time > time_limit:
+            break
+        # Seleciona um lote de folhas, uma por processo
+        batch = []
+        for _ in range(min(workers, iterations - done)):
+            node = root
+            plies = 0
+            while node.untried_moves == [] and node.children:
+                node = node.select_child()
+                game_sim.make_move(node.move)
+                plies += 1
+            if node.untried_moves:
+                node = node.expand(game_sim)
+                plies += 1
+            # A perda virtual desestimula as próximas seleções do lote a repetir este caminho
+            _apply_virtual_loss(node, 1)
+            batch.append((node, game_sim.copy()))
+            for _ in range(plies):
+                game_sim.undo_move()
+
+        futures = [executor.submit(_leaf_worker, leaf_game, rollouts_per_leaf, rollout_fn)
+                   for _, leaf_game in batch]
+        for (node, _), future in zip(batch, futures):
+            total, stats = future.result()
+            _merge_stats(rollout_fn, stats)
+            _apply_virtual_loss(node, -1)
+            backpropagate(node, total / rollouts_per_leaf)
+        done += len(batch)
+
+    best_child = max(root.children, key=lambda c: c.visits)
+    return best_child.move
+
+
+def parallel_mcts(game, workers=None, iterations=200, time_limit=None, mode='root',
+                  rollouts_per_leaf=1, executor=None, rollout_fn=rollout):
+    '''
+    MCTS paralelo; devolve uma jogada do mesmo tipo que mcts().
+
+    :param game: Instância do jogo (não é alterada). Deve poder ser serializada (pickle).
+    :param workers: Número de processos (padrão: os.cpu_count()).
+    :param iterations: Em 'root', iterações de cada processo; em 'leaf', total de folhas simuladas.
+    :param time_limit: Prazo da busca, em segundos (opcional).
+    :param mode: 'root' ou 'leaf'.
+    :param rollouts_per_leaf: Simulações por folha no modo 'leaf' (a média é propagada).
+    :param executor: ProcessPoolExecutor já criado, para não recriar o pool a cada jogada.
+    :param rollout_fn: Função de simulação com a interface de mcts.rollout (deve poder ser
+                       serializada, como um RolloutEngine). Os contadores de um RolloutEngine
+                       recebem a soma do que foi contado nos processos.
+    '''
+    if mode not in ('root', 'leaf'):
+        raise ValueError(f"Modo inválido: {mode!r}. Use 'root' ou 'leaf'.")
+    workers = workers or os.cpu_count()
+    own_executor = executor is None
+    if own_executor:
+        executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        if mode == 'root':
+            return _root_parallel(executor, game, workers, iterations, time_limit, rollout_fn)
+        return _leaf_parallel(executor, game, workers, iterations, time_limit, rollouts_per_leaf,
+                              rollout_fn)
+    finally:
+        if own_executor:
+            executor.shutdown()
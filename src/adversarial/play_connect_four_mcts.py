@@ -1,20 +1,27 @@
 import time
+from concurrent.futures import ProcessPoolExecutor
 
 from colorama import Fore, Style, init
 init(autoreset=True)
 
-from connect_four import ConnectFour, ROWS, COLS
-from mcts import mcts
+from connect_four import ROWS, COLS
+from connect_four_bitboard import BitboardConnectFour
+from connect_four_rollout import RolloutEngine
+from parallel_mcts import parallel_mcts
 from helper_functions import print_board
 
 def play():
     '''
     Main function to play the game
     '''
-    game = ConnectFour()
+    game = BitboardConnectFour()
     human = input("Escolha seu lado (X ou O): ").strip().upper()
     assert human in ['X', 'O']
     ai = 'O' if human == 'X' else 'X'
+    # Pool de processos criado uma vez e reutilizado em todas as jogadas da IA
+    executor = ProcessPoolExecutor()
+    # Simulações sobre os bitboards, vencendo ou bloqueando vitórias imediatas
+    rollout_engine = RolloutEngine('win_block')
 
     while not game.game_over():
         print_board(game.board, COLS)
@@ -32,11 +39,16 @@ def play():
                     print("Entrada inválida.")
         else:
             print("IA pensando...")
-            move = mcts(game, iterations=200)
-            print(f"IA joga na coluna {move}")
+            rollout_engine.reset_stats()
+            # Paralelização na raiz: 200 iterações por processo
+            move = parallel_mcts(game, iterations=200, mode='root', executor=executor,
+                                 rollout_fn=rollout_engine)
+            print(f"IA joga na coluna {move} ({rollout_engine.rollouts:,} simulações, "
+                  f"{rollout_engine.rollouts_per_second:,.0f} simulações/s por processo)")
             game.make_move(move)
             time.sleep(0.5)
 
+    executor.shutdown()
     print_board(game.board)
     winner = game.winner()
     if winner == human:
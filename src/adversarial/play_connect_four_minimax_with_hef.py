@@ -4,8 +4,11 @@ from colorama import Fore, Style, init
 # Reinitialize colorama after reset
 init(autoreset=True)
 
-from minimax import minimax_with_hef
-from connect_four import ConnectFour, ROWS, COLS
+from minimax import minimax_with_hef, iterative_deepening
+from transposition_table import TranspositionTable
+from connect_four import ROWS, COLS
+from connect_four_bitboard import BitboardConnectFour
+from connect_four_eval import evaluate_connect_four_batch
 
 from helper_functions import print_board
 
@@ -57,7 +60,7 @@ def evaluate_connect_four(board, player):
 
 
 # AI Move Selector
-def best_move(game, depth=4):
+def best_move(game, depth=4, table=None):
     '''
     Essa função determina a melhor jogada para a IA em um jogo de Connect Four,
     utilizando o algoritmo Minimax com uma função de avaliação heurística.
@@ -65,35 +68,44 @@ def best_move(game, depth=4):
     heurística para o jogador atual, considerando a profundidade especificada.
     :param game: Instância do jogo Connect Four
     :param depth: Profundidade da busca Minimax
+    :param table: TranspositionTable opcional, mantida entre as jogadas da partida
     :return: A melhor coluna para jogar
     '''
     player = game.current
     best_score = float('-inf')
     move_choice = None
+    if table is not None:
+        table.new_search()
+    # Uma única cópia: a busca altera o tabuleiro com make_move/undo_move
+    game = game.copy()
     for move in game.available_moves():
-        new_game = game.copy()
-        new_game.make_move(move)
+        game.make_move(move)
         # score = minimax_with_dls(new_game, depth - 1, False, player)
         score = minimax_with_hef(
-            game=new_game,
+            game=game,
             depth=depth - 1,
             maximizing=False,
             player=player,
-            evaluate_fn=evaluate_connect_four
+            evaluate_fn=evaluate_connect_four,
+            alpha=best_score,
+            table=table
         )
+        game.undo_move()
         if score > best_score:
             best_score = score
             move_choice = move
     return move_choice
 
-# Replace ConnectFour.print_board with updated function
-ConnectFour.print_board = lambda self: print_board(self.board, COLS)
+# Replace BitboardConnectFour.print_board with updated function
+BitboardConnectFour.print_board = lambda self: print_board(self.board, COLS)
 
 def play():
-    game = ConnectFour()
+    game = BitboardConnectFour()
     human = input("Escolha seu lado (X ou O): ").strip().upper()
     assert human in ['X', 'O']
     ai = 'O' if human == 'X' else 'X'
+    # A tabela de transposição é mantida entre as jogadas da IA
+    table = TranspositionTable()
 
     while not game.game_over():
         game.print_board()
@@ -111,7 +123,9 @@ def play():
                     print("Entrada inválida.")
         else:
             print("IA pensando...")
-            move = best_move(game, depth=4)
+            # Aprofundamento iterativo com orçamento de 200 ms por jogada
+            move = iterative_deepening(game, evaluate_connect_four, time_limit=0.2, table=table,
+                                       batch_evaluate_fn=evaluate_connect_four_batch)
             print(f"IA joga na coluna {move}")
             game.make_move(move)
             time.sleep(0.8)
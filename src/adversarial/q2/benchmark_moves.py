@@ -0,0 +1,79 @@
+"""
+Compara a geração de jogadas do Quarto: a lista antiga, que testa
+`piece in available_next_pieces` para as 16 peças em cada casa, contra o
+gerador por máscaras de bits de BitboardQuarto.moves().
+
+Uso: python benchmark_moves.py
+"""
+import random
+import time
+
+from quarto_bitboard import BitboardQuarto
+from quarto_game import QuartoGame
+
+
+def list_moves(game_state):
+    """Geração antiga, com busca em listas (referência)."""
+    moves = []
+    available_pos = game_state.available_moves()
+    if not available_pos:
+        return []
+    available_next_pieces = [p for p in game_state.available_pieces if p != game_state.selected_piece]
+    if not available_next_pieces:
+        return [(r, c, -1) for r, c in available_pos]
+    for row, col in available_pos:
+        for idx, piece in enumerate(game_state.all_pieces):
+            if piece in available_next_pieces:
+                moves.append((row, col, idx))
+    return moves
+
+
+def random_positions(count, seed=0):
+    rng = random.Random(seed)
+    positions = []
+    while len(positions) < count:
+        game = QuartoGame()
+        game.select_next_piece(rng.randrange(16))
+        for _ in range(rng.randrange(12)):
+            moves = list_moves(game)
+            rng.shuffle(moves)
+            for move in moves:
+                game.play_turn(move)
+                if not game.check_win():
+                    break
+                game.undo_move()
+        positions.append(game)
+    return positions
+
+
+def measure(generate, states, repeat):
+    generated = 0
+    start = time.perf_counter()
+    for _ in range(repeat):
+        for state in states:
+            for _ in generate(state):
+                generated += 1
+    return generated / (time.perf_counter() - start)
+
+
+if __name__ == "__main__":
+    games = random_positions(200)
+    boards = [BitboardQuarto.from_game(game) for game in games]
+    assert all(list_moves(g) == list(b.moves()) for g, b in zip(games, boards))
+
+    before = measure(list_moves, games, 20)
+    before_board = measure(list_moves, boards, 20)
+    after = measure(BitboardQuarto.moves, boards, 20)
+    print(f"Antes  (listas, QuartoGame):         {before:12,.0f} jogadas/s")
+    print(f"Antes  (listas, BitboardQuarto):     {before_board:12,.0f} jogadas/s")
+    print(f"Depois (máscaras, BitboardQuarto):   {after:12,.0f} jogadas/s  ({after / before:.1f}x)")
+
+    # Uma jogada aleatória por posição, como nas simulações do MCTS
+    for name, pick in (("random.choice(lista)", lambda b: random.choice(list_moves(b))),
+                       ("random_move()", BitboardQuarto.random_move)):
+        start = time.perf_counter()
+        for _ in range(20):
+            for board in boards:
+                pick(board)
+        rate = 20 * len(boards) / (time.perf_counter() - start)
+        print(f"Simulação, {name:<24} {rate:12,.0f} sorteios/s")
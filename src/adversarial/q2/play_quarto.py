@@ -1,6 +1,7 @@
 from quarto_game import QuartoGame
 from quarto_minimax import best_move_quarto
-from quarto_mcts import quarto_mcts
+from quarto_mcts import QuartoMCTSSearcher
+from quarto_endgame import with_endgame
 from colorama import Fore, init
 import random
 import time
@@ -175,11 +176,14 @@ def main_menu():
         op = input(Fore.YELLOW + "Escolha uma opção: ")
 
         if op == "1":
-            # Depth 2 é rápido e joga razoavelmente
-            play_human_vs_ai(lambda g: best_move_quarto(g, depth=2), ai_name="Minimax")
+            # Profundidade padrão (3), com tabela de transposição canônica;
+            # jogo perfeito no final da partida
+            play_human_vs_ai(with_endgame(best_move_quarto), ai_name="Minimax")
         elif op == "2":
-            # 5000 iterações ou 2 segundos, o que vier primeiro
-            play_human_vs_ai(lambda g: quarto_mcts(g, iterations=5000, time_limit=2.0), ai_name="MCTS")
+            # 5000 iterações ou 2 segundos, o que vier primeiro; a árvore é
+            # reaproveitada entre as jogadas da partida; jogo perfeito no final
+            play_human_vs_ai(with_endgame(QuartoMCTSSearcher(iterations=5000, time_limit=2.0)),
+                             ai_name="MCTS")
         elif op == "3":
             show_tutorial()
         elif op == "4":
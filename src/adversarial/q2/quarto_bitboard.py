@@ -0,0 +1,229 @@
+"""
+Estado compacto do Quarto para as buscas (minimax e MCTS).
+
+Cada peça é um nibble: o índice global (0-15) da peça (h, c, s, t) em
+all_pieces é h*8 + c*4 + s*2 + t, ou seja, os 4 bits do índice são os 4
+atributos. O estado cabe em poucos inteiros:
+  - cells: 16 nibbles, um por casa (casa q = linha*4 + coluna, bits 4q..4q+3);
+  - occupied: máscara de 16 bits das casas ocupadas;
+  - available: máscara de 16 bits das peças que ainda podem ser escolhidas
+    (nem colocadas nem selecionadas);
+  - selected: índice da peça a ser colocada, ou -1.
+
+Uma linha completa é vitória exatamente quando o AND das suas quatro peças,
+ou o AND dos complementos, é diferente de zero. Só as linhas que passam pela
+casa da última peça colocada são testadas, e o resultado fica guardado, de
+modo que check_win() é O(1). A cópia também não percorre o tabuleiro.
+
+A interface é a mesma de QuartoGame (available_moves, make_move, undo_move,
+select_next_piece, play_turn, check_win, winner, history...), com
+selected_piece e available_pieces devolvendo tuplas como lá. Os turnos de
+history são tuplas imutáveis, então copy() copia só a lista externa.
+"""
+
+import random
+
+ALL_PIECES = [(h, c, s, t) for h in [0, 1] for c in [0, 1] for s in [0, 1] for t in [0, 1]]
+PIECE_INDEX = {piece: idx for idx, piece in enumerate(ALL_PIECES)}
+
+LINES = ([[r * 4 + c for c in range(4)] for r in range(4)]      # horizontais
+         + [[r * 4 + c for r in range(4)] for c in range(4)]    # verticais
+         + [[i * 5 for i in range(4)], [i * 3 + 3 for i in range(4)]])  # diagonais
+# Para cada casa: (máscara das casas, deslocamentos dos nibbles) das linhas que passam por ela
+LINES_THROUGH = [[(sum(1 << sq for sq in line), tuple(4 * sq for sq in line))
+                  for line in LINES if q in line] for q in range(16)]
+# Máscara de 16 bits (todas as casas ou todas as peças)
+FULL_MASK = (1 << 16) - 1
+# Índices dos bits ligados de cada byte de uma máscara de 16 bits (baixo e alto)
+LOW_BITS = [tuple(i for i in range(8) if v >> i & 1) for v in range(256)]
+HIGH_BITS = [tuple(i + 8 for i in range(8) if v >> i & 1) for v in range(256)]
+
+
+def wins_at(cells, occupied, q):
+    """Verifica se alguma linha completa que passa pela casa q é vitória."""
+    for mask, shifts in LINES_THROUGH[q]:
+        if occupied & mask != mask:
+            continue
+        same_one = same_zero = 15
+        for shift in shifts:
+            nibble = cells >> shift & 15
+            same_one &= nibble
+            same_zero &= ~nibble
+        if same_one or same_zero:
+            return True
+    return False
+
+
+class BitboardQuarto:
+    all_pieces = ALL_PIECES
+
+    def __init__(self):
+        self.cells = 0
+        self.occupied = 0
+        self.available = FULL_MASK
+        self.selected = -1
+        self.current = 0  # 0 = humano, 1 = IA
+        # Pilha de turnos: (linha, coluna, peça colocada, peça escolhida para o oponente)
+        self.history = []
+        self._won = False
+        # Número de turnos no momento em que a vitória ocorreu (para undo_move)
+        self._won_ply = None
+
+    @classmethod
+    def from_game(cls, game):
+        """Converte um QuartoGame (ou copia um BitboardQuarto)."""
+        if isinstance(game, BitboardQuarto):
+            return game.copy()
+        new = cls()
+        for r in range(4):
+            for c in range(4):
+                piece = game.board[r][c]
+                if piece is not None:
+                    q = r * 4 + c
+                    new.cells |= PIECE_INDEX[piece] << 4 * q
+                    new.occupied |= 1 << q
+        new.available = 0
+        for piece in game.available_pieces:
+            new.available |= 1 << PIECE_INDEX[piece]
+        new.selected = -1 if game.selected_piece is None else PIECE_INDEX[game.selected_piece]
+        new.current = game.current
+        new.history = [tuple(turn) for turn in game.history]
+        if game.check_win():
+            new._won = True
+            new._won_ply = len(new.history)
+        return new
+
+    def copy(self):
+        new = BitboardQuarto.__new__(BitboardQuarto)
+        new.cells = self.cells
+        new.occupied = self.occupied
+        new.available = self.available
+        new.selected = self.selected
+        new.current = self.current
+        new.history = self.history[:]
+        new._won = self._won
+        new._won_ply = self._won_ply
+        return new
+
+    @property
+    def board(self):
+        """Tabuleiro no formato de QuartoGame (lista de listas de tuplas ou None)."""
+        return [[ALL_PIECES[self.cells >> 4 * (r * 4 + c) & 15] if self.occupied >> (r * 4 + c) & 1 else None
+                 for c in range(4)] for r in range(4)]
+
+    @property
+    def selected_piece(self):
+        return None if self.selected < 0 else ALL_PIECES[self.selected]
+
+    @property
+    def available_pieces(self):
+        return [ALL_PIECES[i] for i in range(16) if self.available >> i & 1]
+
+    def available_moves(self):
+        """Retorna lista de posições (r, c) vazias."""
+        free = ~self.occupied & FULL_MASK
+        return [(q >> 2, q & 3) for q in range(16) if free >> q & 1]
+
+    def moves(self):
+        """
+        Gera as jogadas (row, col, next_piece_idx) sob demanda, percorrendo os
+        bits das máscaras de casas livres e de peças disponíveis, na mesma ordem
+        da antiga lista (casa, depois índice da peça). Sem peças para escolher,
+        o índice é -1. As máscaras são lidas uma vez, então o jogo pode ser
+        alterado (e restaurado) entre um item e outro.
+        """
+        free = ~self.occupied & FULL_MASK
+        available = self.available
+        while free:
+            low = free & -free
+            free ^= low
+            q = low.bit_length() - 1
+            row, col = q >> 2, q & 3
+            if not available:
+                yield (row, col, -1)
+                continue
+            pieces = available
+            while pieces:
+                bit = pieces & -pieces
+                pieces ^= bit
+                yield (row, col, bit.bit_length() - 1)
+
+    def random_move(self):
+        """Uma jogada uniforme entre as de moves(), sem gerar a lista, ou None."""
+        free = ~self.occupied & FULL_MASK
+        if not free:
+            return None
+        q = random.choice(LOW_BITS[free & 255] + HIGH_BITS[free >> 8])
+        if not self.available:
+            return (q >> 2, q & 3, -1)
+        pieces = self.available
+        piece = random.choice(LOW_BITS[pieces & 255] + HIGH_BITS[pieces >> 8])
+        return (q >> 2, q & 3, piece)
+
+    def make_move(self, row, col):
+        """Coloca a peça selecionada no tabuleiro. Alterna jogador."""
+        if self.selected < 0:
+            raise ValueError("Nenhuma peça selecionada para jogar!")
+        q = row * 4 + col
+        if self.occupied >> q & 1:
+            raise ValueError("Posição já ocupada!")
+        self.cells |= self.selected << 4 * q
+        self.occupied |= 1 << q
+        self.history.append((row, col, ALL_PIECES[self.selected], None))
+        if not self._won and wins_at(self.cells, self.occupied, q):
+            self._won = True
+            self._won_ply = len(self.history)
+        self.selected = -1
+        self.current = 1 - self.current
+
+    def undo_move(self):
+        """Desfaz o último turno (a colocação e, se houver, a escolha da próxima peça)."""
+        if self._won_ply == len(self.history):
+            self._won = False
+            self._won_ply = None
+        row, col, piece, next_piece = self.history.pop()
+        if next_piece is not None:
+            self.available |= 1 << PIECE_INDEX[next_piece]
+        q = row * 4 + col
+        self.cells &= ~(15 << 4 * q)
+        self.occupied &= ~(1 << q)
+        self.selected = PIECE_INDEX[piece]
+        self.current = 1 - self.current
+
+    def select_next_piece(self, idx):
+        """Escolhe a próxima peça que o oponente jogará (baseado no índice 0-15)."""
+        if idx < 0 or idx >= 16:
+            raise ValueError(f"Índice inválido ({idx}). Deve ser 0-15.")
+        if not self.available >> idx & 1:
+            raise ValueError(f"Peça ({idx}) já usada.")
+        self.selected = idx
+        self.available &= ~(1 << idx)
+        if self.history and self.history[-1][3] is None:
+            # O turno é trocado, não alterado: cópias podem compartilhá-lo
+            row, col, piece, _ = self.history[-1]
+            self.history[-1] = (row, col, piece, ALL_PIECES[idx])
+
+    def play_turn(self, move):
+        """
+        Aplica um turno completo (row, col, next_piece_idx), como QuartoGame.play_turn.
+        Retorna False, sem alterar o jogo, se o movimento for inválido.
+        """
+        row, col, next_idx = move
+        if self.selected < 0 or self.occupied >> (row * 4 + col) & 1:
+            return False
+        self.make_move(row, col)
+        if not self._won and next_idx != -1:
+            if not (0 <= next_idx < 16 and self.available >> next_idx & 1):
+                self.undo_move()
+                return False
+            self.select_next_piece(next_idx)
+        return True
+
+    def check_win(self):
+        return self._won
+
+    def winner(self):
+        if self._won:
+            # O jogador anterior (que acabou de jogar) venceu
+            return "Humano" if self.current == 1 else "IA"
+        return None
@@ -10,6 +10,8 @@ class QuartoGame(QuartoBoard):
         self.available_pieces = self.all_pieces.copy()
         self.current = 0  # 0 = humano, 1 = IA
         self.selected_piece = None
+        # Pilha de turnos: [linha, coluna, peça colocada, peça escolhida para o oponente]
+        self.history = []
 
     def copy(self):
         new_game = QuartoGame()
@@ -18,6 +20,7 @@ class QuartoGame(QuartoBoard):
         new_game.all_pieces = self.all_pieces.copy()
         new_game.current = self.current
         new_game.selected_piece = self.selected_piece
+        new_game.history = [turn.copy() for turn in self.history]
         return new_game
 
     def available_moves(self):
@@ -32,9 +35,19 @@ class QuartoGame(QuartoBoard):
             raise ValueError("Posição já ocupada!")
         
         self.board[row][col] = self.selected_piece
+        self.history.append([row, col, self.selected_piece, None])
         self.selected_piece = None
         self.current = 1 - self.current # Troca o jogador
 
+    def undo_move(self):
+        """Desfaz o último turno: a peça volta a ser a selecionada e a próxima peça escolhida volta às disponíveis."""
+        row, col, piece, next_piece = self.history.pop()
+        if next_piece is not None:
+            self.available_pieces.append(next_piece)
+        self.board[row][col] = None
+        self.selected_piece = piece
+        self.current = 1 - self.current
+
     def select_next_piece(self, idx):
         """Escolhe a próxima peça que o oponente jogará (baseado no índice 0-15)."""
         if idx < 0 or idx >= len(self.all_pieces):
@@ -44,6 +57,28 @@ class QuartoGame(QuartoBoard):
             raise ValueError(f"Peça ({idx}) já usada.")
         self.selected_piece = piece
         self.available_pieces.remove(piece)
+        # A escolha faz parte do turno de quem acabou de colocar uma peça
+        if self.history and self.history[-1][3] is None:
+            self.history[-1][3] = piece
+
+    def play_turn(self, move):
+        """
+        Aplica um turno completo (row, col, next_piece_idx): coloca a peça e, se o
+        jogo não acabou, escolhe a próxima. Retorna False, sem alterar o jogo, se o
+        movimento for inválido. O turno é desfeito com undo_move().
+        """
+        row, col, next_idx = move
+        try:
+            self.make_move(row, col)
+        except ValueError:
+            return False
+        if not self.check_win() and next_idx != -1:
+            try:
+                self.select_next_piece(next_idx)
+            except ValueError:
+                self.undo_move()
+                return False
+        return True
 
     def check_win(self):
         lines = []
@@ -1,8 +1,12 @@
 import math, random, time
 
+from quarto_bitboard import BitboardQuarto
+
 class Node:
     def __init__(self, game, parent=None, move=None):
-        self.game = game.copy() # Armazena uma cópia do estado
+        # O estado não é copiado: a busca refaz as jogadas em um único tabuleiro.
+        # Guarda apenas o jogador que fará a próxima jogada a partir deste nó.
+        self.current = game.current
         self.parent = parent
         self.move = move # move é (row, col, next_piece_idx)
         self.children = []
@@ -15,21 +19,7 @@ class Node:
 
     def get_all_moves(self, game_state):
         """Gera todas as jogadas (posição + próxima peça) possíveis."""
-        moves = []
-        available_pos = game_state.available_moves()
-        if not available_pos:
-            return []
-            
-        available_next_pieces = [p for p in game_state.available_pieces if p != game_state.selected_piece]
-        
-        if not available_next_pieces:
-            return [(r, c, -1) for r, c in available_pos] # -1 como índice "dummy"
-
-        for row, col in available_pos:
-            for idx, piece in enumerate(game_state.all_pieces):
-                if piece in available_next_pieces:
-                    moves.append((row, col, idx))
-        return moves
+        return list(game_state.moves())
 
     def ucb1(self, c=1.41): # c = sqrt(2)
         if self.visits == 0:
@@ -46,23 +36,21 @@ class Node:
         """Seleciona o filho com maior UCB1."""
         return max(self.children, key=lambda child: child.ucb1())
 
-    def expand(self):
-        """Expande um nó filho a partir de um movimento não tentado."""
+    def expand(self, game):
+        """
+        Expande um nó filho a partir de um movimento não tentado.
+        O movimento é aplicado em `game`, que deve estar no estado deste nó.
+        """
         if not self.untried_moves:
             return None 
             
         move = self.untried_moves.pop() # move é (r, c, idx)
-        new_game = self.game.copy()
 
-        try:
-            new_game.make_move(move[0], move[1]) # Passo 1
-            if not new_game.check_win() and move[2] != -1:
-                new_game.select_next_piece(move[2]) # Passo 2
-        except ValueError:
+        if not game.play_turn(move):
             # Se o movimento for inválido (raro), tenta expandir o próximo
-            return self.expand() if self.untried_moves else None
+            return self.expand(game) if self.untried_moves else None
 
-        child = Node(new_game, parent=self, move=move)
+        child = Node(game, parent=self, move=move)
         self.children.append(child)
         return child
 
@@ -75,18 +63,17 @@ class Node:
         # O nó pai representa o jogador OPOSTO ao nó atual.
         # O 'current' do jogo no nó representa o jogador que fará a *próxima* jogada.
         # O jogador que *fez a jogada* para chegar a ESTE nó é (1 - game.current).
-        player_who_moved_to_this_node = 1 - self.game.current
+        player_who_moved_to_this_node = 1 - self.current
         
         if player_who_moved_to_this_node == result_player:
             self.wins += 1
 
 
-def quarto_mcts(game, iterations=500, time_limit=None):
-    root_game = game.copy()
-    root = Node(root_game)
-    # O jogador na raiz (quem está prestes a jogar)
-    root_player = root_game.current 
-    
+def run_iterations(root, root_game, iterations, time_limit=None):
+    """
+    Executa as iterações do MCTS a partir de `root`, cujo estado é `root_game`.
+    O jogo é alterado com play_turn/undo_move e volta ao estado da raiz ao final.
+    """
     start_time = time.time()
     
     actual_iterations = 0
@@ -98,42 +85,34 @@ def quarto_mcts(game, iterations=500, time_limit=None):
             break
 
         node = root
-        sim_game = root_game.copy()
+        sim_game = root_game
+        plies = 0
 
         # 1. Seleção (Select)
         while not node.untried_moves and node.children:
             node = node.select()
             # Atualiza o sim_game para o estado do nó filho
-            sim_game = node.game.copy()
+            sim_game.play_turn(node.move)
+            plies += 1
 
         # 2. Expansão (Expand)
         if node.untried_moves:
-            child_node = node.expand()
+            child_node = node.expand(sim_game)
             if child_node:
                 node = child_node
-                sim_game = node.game.copy() # Jogo já avançado na expansão
+                plies += 1 # Jogo já avançado na expansão
 
         # 3. Simulação (Playout)
         # O estado em 'sim_game' é o resultado da expansão.
-        # Agora simulamos aleatoriamente até o fim.
-        while not sim_game.check_win() and (sim_game.available_moves() or sim_game.selected_piece):
-            # Se não há mais movimentos (tabuleiro cheio) mas ainda há uma peça selecionada
-            if not sim_game.available_moves() and sim_game.selected_piece:
-                 break # Jogo empata (não há onde colocar)
-                 
-            # Gera movimentos aleatórios
-            moves = node.get_all_moves(sim_game)
-            if not moves:
-                break # Fim da simulação
-            
-            move = random.choice(moves)
-            
-            try:
-                sim_game.make_move(move[0], move[1])
-                if not sim_game.check_win() and move[2] != -1:
-                    sim_game.select_next_piece(move[2])
-            except ValueError:
+        # Agora simulamos aleatoriamente até o fim, sorteando cada jogada
+        # direto das máscaras, sem gerar a lista de jogadas.
+        while not sim_game.check_win():
+            move = sim_game.random_move()
+            if move is None:
+                break # Tabuleiro cheio: empate
+            if not sim_game.play_turn(move):
                 break # Pára a simulação se algo der errado
+            plies += 1
 
         # 4. Backpropagation
         winner = sim_game.winner()
@@ -151,15 +130,79 @@ def quarto_mcts(game, iterations=500, time_limit=None):
             # O 'current' do jogo no nó atual é quem JOGA *A PARTIR* deste nó.
             # O nó PAI é o jogador anterior, (1 - node.game.current).
             if node.parent:
-                player_of_parent_node = 1 - node.game.current
+                player_of_parent_node = 1 - node.current
                 if player_of_parent_node == result_player:
                     node.wins += 1 # O pai (que escolheu este nó) ganhou
             node = node.parent
 
+        # Volta o tabuleiro ao estado da raiz
+        for _ in range(plies):
+            sim_game.undo_move()
+
+
+def most_visited_move(root, root_game):
     # Retorna o movimento do filho mais visitado (política mais robusta)
     if not root.children:
         moves = root.get_all_moves(root_game)
         return random.choice(moves) if moves else None
 
     best_child = max(root.children, key=lambda c: c.visits)
-    return best_child.move
\ No newline at end of file
+    return best_child.move
+
+
+def quarto_mcts(game, iterations=500, time_limit=None):
+    # Uma única cópia do jogo (no formato compacto), alterada com play_turn/undo_move
+    root_game = BitboardQuarto.from_game(game)
+    root = Node(root_game)
+    run_iterations(root, root_game, iterations, time_limit)
+    return most_visited_move(root, root_game)
+
+
+def position_key(game):
+    """Identifica a posição: tabuleiro, peça selecionada e jogador da vez."""
+    return (tuple(map(tuple, game.board)), game.selected_piece, game.current)
+
+
+class QuartoMCTSSearcher:
+    """
+    MCTS persistente: a árvore é mantida entre as jogadas de uma partida.
+
+    A cada chamada de search(game), a raiz avança pelos turnos jogados desde a
+    busca anterior (lidos de game.history), inclusive a resposta do oponente, e
+    os ramos irmãos, que não podem mais ser alcançados, são descartados. As
+    estatísticas já acumuladas na subárvore continuam valendo. Se a posição não
+    puder ser alcançada a partir da raiz anterior (outra partida, por exemplo),
+    a árvore é recriada.
+    """
+    def __init__(self, iterations=500, time_limit=None):
+        self.iterations = iterations
+        self.time_limit = time_limit
+        self.root = None
+        self.root_game = None
+
+    def advance(self, game):
+        """Move a raiz até a posição de `game`. Retorna False se não for possível."""
+        if self.root is None:
+            return False
+        done = len(self.root_game.history)
+        # Os turnos de BitboardQuarto são tuplas; os de QuartoGame, listas
+        if [tuple(turn) for turn in game.history[:done]] != self.root_game.history:
+            return False
+        for row, col, _, next_piece in game.history[done:]:
+            next_idx = self.root_game.all_pieces.index(next_piece) if next_piece is not None else -1
+            child = next((c for c in self.root.children if c.move == (row, col, next_idx)), None)
+            if child is None or not self.root_game.play_turn(child.move):
+                return False
+            child.parent = None # Descarta a raiz antiga e os irmãos
+            self.root = child
+        return position_key(self.root_game) == position_key(game)
+
+    def search(self, game):
+        if not self.advance(game):
+            self.root_game = BitboardQuarto.from_game(game)
+            self.root = Node(self.root_game)
+        run_iterations(self.root, self.root_game, self.iterations, self.time_limit)
+        return most_visited_move(self.root, self.root_game)
+
+    def __call__(self, game):
+        return self.search(game)
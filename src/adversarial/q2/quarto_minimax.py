@@ -1,5 +1,14 @@
 import random
 
+from quarto_bitboard import BitboardQuarto
+from quarto_symmetry import canonical_key
+from quarto_table import TranspositionTable, EXACT, LOWER, UPPER
+
+# Abaixo desta profundidade restante a chave canônica custa mais que a subárvore
+TABLE_MIN_DEPTH = 2
+# Com a tabela e a poda na raiz, profundidade 3 custa menos que a antiga profundidade 2
+DEFAULT_DEPTH = 3
+
 def evaluate(game, player_at_root):
     """
     Avalia o estado do jogo.
@@ -21,106 +30,109 @@ def evaluate(game, player_at_root):
     # Avaliação neutra se o jogo não acabou
     return 0
 
-def minimax(game, depth, maximizing, player_at_root, alpha, beta):
+def minimax(game, depth, maximizing, player_at_root, alpha, beta, table=None):
     """
     Executa o minimax com poda alpha-beta.
     player_at_root: O jogador (0 ou 1) que chamou o best_move.
+    table: Tabela de transposição (opcional), indexada pela chave canônica do
+           estado; só é consultada com profundidade >= TABLE_MIN_DEPTH.
     """
     # Condições de parada
     if depth == 0 or game.check_win() or (not game.available_moves() and game.selected_piece is None):
         return evaluate(game, player_at_root)
 
+    key = None
+    alpha_orig, beta_orig = alpha, beta
+    if table is not None and depth >= TABLE_MIN_DEPTH:
+        key = canonical_key(game.cells, game.occupied, game.selected) << 1 | maximizing
+        entry = table.lookup(key)
+        if entry is not None and entry[0] >= depth:
+            _, score, flag = entry
+            if flag == EXACT:
+                return score
+            if flag == LOWER:
+                alpha = max(alpha, score)
+            else:
+                beta = min(beta, score)
+            if alpha >= beta:
+                return score
+
     if maximizing:
         max_eval = float('-inf')
-        for move in get_all_moves(game):
-            new_game = game.copy()
-            row, col, next_idx = move
-            
-   
-            try:
-                new_game.make_move(row, col) # Passo 1: Coloca peça
-                # Se o jogo não acabou após colocar, seleciona a próxima
-                if not new_game.check_win() and next_idx != -1:
-                    new_game.select_next_piece(next_idx) # Passo 2: Seleciona próxima
-            except ValueError:
+        for move in game.moves():
+            if not game.play_turn(move):
                 continue # Movimento inválido (ex: peça já usada), pular
 
-            eval = minimax(new_game, depth - 1, False, player_at_root, alpha, beta)
+            eval = minimax(game, depth - 1, False, player_at_root, alpha, beta, table)
+            game.undo_move()
             max_eval = max(max_eval, eval)
             alpha = max(alpha, eval)
             if beta <= alpha:
                 break # Poda Beta
-        return max_eval
+        result = max_eval
     
     else: # Minimizing
         min_eval = float('inf')
-        for move in get_all_moves(game):
-            new_game = game.copy()
-            row, col, next_idx = move
-
-            try:
-                new_game.make_move(row, col) # Passo 1
-                if not new_game.check_win() and next_idx != -1:
-                    new_game.select_next_piece(next_idx) # Passo 2
-            except ValueError:
-                continue 
-
-            eval = minimax(new_game, depth - 1, True, player_at_root, alpha, beta)
+        for move in game.moves():
+            if not game.play_turn(move):
+                continue
+
+            eval = minimax(game, depth - 1, True, player_at_root, alpha, beta, table)
+            game.undo_move()
             min_eval = min(min_eval, eval)
             beta = min(beta, eval)
             if beta <= alpha:
                 break # Poda Alpha
-        return min_eval
+        result = min_eval
+
+    if key is not None:
+        if result <= alpha_orig:
+            flag = UPPER
+        elif result >= beta_orig:
+            flag = LOWER
+        else:
+            flag = EXACT
+        table.store(key, depth, result, flag)
+    return result
 
 def get_all_moves(game):
     """Gera todas as jogadas (posição + próxima peça) possíveis."""
-    moves = []
-    available_pos = game.available_moves()
-    if not available_pos:
-        return []
-        
-    # Peças que o oponente poderá jogar
-    available_next_pieces = [p for p in game.available_pieces if p != game.selected_piece]
-    
-    if not available_next_pieces:
-        # Este é o último movimento (só há a peça atual para jogar)
-        # Retorna jogadas para qualquer posição, com -1 como índice "dummy"
-        return [(r, c, -1) for r, c in available_pos]
-
-    for row, col in available_pos:
-        for idx, piece in enumerate(game.all_pieces):
-            if piece in available_next_pieces:
-                moves.append((row, col, idx))
-    return moves
-
-def best_move_quarto(game, depth=2):
+    if not isinstance(game, BitboardQuarto):
+        game = BitboardQuarto.from_game(game)
+    return list(game.moves())
+
+def best_move_quarto(game, depth=DEFAULT_DEPTH, table=None):
+    """
+    Melhor jogada para quem está na vez. Estados simétricos dividem as entradas
+    da tabela de transposição (criada para a busca se não for passada).
+    """
     player_at_root = game.current # 0 = Humano, 1 = IA
     best_score = float('-inf')
     best_move = None
+    if table is None:
+        table = TranspositionTable()
     
-    moves = get_all_moves(game)
+    # Uma única cópia, no formato compacto: a busca altera o tabuleiro com play_turn/undo_move
+    game = BitboardQuarto.from_game(game)
+
+    moves = list(game.moves())
     if not moves:
         return None # Jogo acabou
 
     random.shuffle(moves) # Para variedade
 
     for move in moves:
-        new_game = game.copy()
-        row, col, next_piece_index = move
-  
-        try:
-            new_game.make_move(row, col) # Passo 1
-            if not new_game.check_win() and next_piece_index != -1:
-                new_game.select_next_piece(next_piece_index) # Passo 2
-        except ValueError:
+        if not game.play_turn(move):
             continue # Pula movimento inválido
 
         # (Profundidade - 1) pois já fizemos um movimento
         # 'False' pois é a vez do oponente (minimizador)
-        score = minimax(new_game, depth - 1, False, player_at_root, float('-inf'), float('inf')) 
+        # alpha = best_score: só interessa saber se a jogada supera a melhor até agora
+        score = minimax(game, depth - 1, False, player_at_root, best_score, float('inf'), table)
+        game.undo_move()
 
         if score > best_score:
             best_score = score
             best_move = move
             
-    return best_move
\ No newline at end of file
+    return best_move
@@ -0,0 +1,92 @@
+"""
+Canonicalização de estados do Quarto sob as simetrias do jogo.
+
+Um estado (tabuleiro + peça selecionada; as peças disponíveis são as que
+sobram) tem o mesmo valor que qualquer outro obtido por:
+  - uma das 32 permutações de casas que preservam as 10 linhas (as 8
+    rotações/reflexões, a troca das linhas/colunas internas com as externas
+    e a troca das duas do meio, e suas composições);
+  - a inversão de qualquer atributo (XOR da peça com uma máscara);
+  - qualquer permutação dos 4 atributos (dos bits da peça).
+
+canonical_key() devolve o mesmo inteiro para todos os estados de uma mesma
+classe. A inversão é fixada fazendo o XOR de todas as peças com a peça
+selecionada (que vira 0). Para cada permutação de casas, cada atributo vira
+uma coluna de 16 bits (o bit da casa q é o atributo da peça na casa q) e
+ordenar as 4 colunas fixa a permutação de atributos. A chave é o menor valor
+entre as 32 permutações de casas.
+"""
+from quarto_bitboard import LINES
+
+
+def _square_permutations():
+    """Gera as 32 permutações de casas que levam linhas em linhas."""
+    def perm(f):
+        return tuple(f(q >> 2, q & 3)[0] * 4 + f(q >> 2, q & 3)[1] for q in range(16))
+    outer = [1, 0, 3, 2]
+    middle = [0, 2, 1, 3]
+    generators = [
+        perm(lambda r, c: (c, 3 - r)),                  # rotação de 90°
+        perm(lambda r, c: (r, 3 - c)),                  # reflexão
+        perm(lambda r, c: (outer[r], outer[c])),        # externas <-> internas
+        perm(lambda r, c: (middle[r], middle[c])),      # troca das do meio
+    ]
+    group = {tuple(range(16))}
+    frontier = list(group)
+    while frontier:
+        p = frontier.pop()
+        for g in generators:
+            composed = tuple(g[p[q]] for q in range(16))
+            if composed not in group:
+                group.add(composed)
+                frontier.append(composed)
+    lines = {frozenset(line) for line in LINES}
+    assert all({frozenset(p[q] for q in line) for line in lines} == lines for p in group)
+    return sorted(group)
+
+
+PERMUTATIONS = _square_permutations()
+
+# COLUMN_BITS[n][q]: bits da peça n espalhados nas colunas de atributo (bit 16*j + q)
+COLUMN_BITS = [[sum(((n >> j) & 1) << (16 * j + q) for j in range(4)) for q in range(16)]
+               for n in range(16)]
+
+
+def _tables(p):
+    # Para cada byte de cells (2 casas) e cada valor do byte, as colunas de
+    # atributos já permutadas; e o mesmo para os dois bytes de occupied.
+    gather = [[COLUMN_BITS[v & 15][p[2 * b]] | COLUMN_BITS[v >> 4][p[2 * b + 1]] for v in range(256)]
+              for b in range(8)]
+    occupancy = [[sum(((v >> i) & 1) << p[8 * b + i] for i in range(8)) for v in range(256)]
+                 for b in range(2)]
+    return tuple(gather) + tuple(occupancy)
+
+
+TABLES = [_tables(p) for p in PERMUTATIONS]
+
+# Nibble 0xF em cada casa ocupada, por byte de occupied
+SPREAD = [sum(15 << 4 * i for i in range(8) if v >> i & 1) for v in range(256)]
+REPEAT = [n * 0x1111111111111111 for n in range(16)]
+NO_SELECTION = 1 << 80
+
+
+def canonical_key(cells, occupied, selected):
+    """
+    Chave canônica do estado dado pelos campos de um BitboardQuarto
+    (cells, occupied, selected).
+    """
+    if selected >= 0:
+        cells ^= REPEAT[selected] & (SPREAD[occupied & 255] | SPREAD[occupied >> 8] << 32)
+    b0, b1, b2, b3 = cells & 255, cells >> 8 & 255, cells >> 16 & 255, cells >> 24 & 255
+    b4, b5, b6, b7 = cells >> 32 & 255, cells >> 40 & 255, cells >> 48 & 255, cells >> 56
+    lo, hi = occupied & 255, occupied >> 8
+    best = None
+    for g0, g1, g2, g3, g4, g5, g6, g7, o0, o1 in TABLES:
+        c = g0[b0] | g1[b1] | g2[b2] | g3[b3] | g4[b4] | g5[b5] | g6[b6] | g7[b7]
+        cols = sorted((c & 0xFFFF, c >> 16 & 0xFFFF, c >> 32 & 0xFFFF, c >> 48))
+        key = o0[lo] | o1[hi] | cols[0] << 16 | cols[1] << 32 | cols[2] << 48 | cols[3] << 64
+        if best is None or key < best:
+            best = key
+    if selected < 0:
+        best |= NO_SELECTION
+    return best
@@ -0,0 +1,40 @@
+from collections import OrderedDict
+
+# Tipos de limite guardados em cada entrada
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class TranspositionTable:
+    """
+    Tabela de transposição limitada a `max_entries` entradas. Quando enche,
+    descarta a entrada usada há mais tempo (LRU).
+
+    Cada entrada é uma tupla (profundidade, valor, limite). Como as chaves são
+    canônicas (veja quarto_symmetry), estados simétricos dividem a mesma
+    entrada; por isso a melhor jogada não é guardada, já que ela depende da
+    simetria.
+    """
+    def __init__(self, max_entries=200_000):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.hits = 0
+
+    def lookup(self, key):
+        entry = self.entries.get(key)
+        if entry is not None:
+            self.entries.move_to_end(key)
+            self.hits += 1
+        return entry
+
+    def store(self, key, depth, score, flag):
+        self.entries[key] = (depth, score, flag)
+        self.entries.move_to_end(key)
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def clear(self):
+        self.entries.clear()
+        self.hits = 0
+
+    def __len__(self):
+        return len(self.entries)
@@ -76,9 +76,15 @@ class TicTacToe(BoardGame):
         if self.board[r][c] == ' ':
             self.board[r][c] = self.current
             self.current = 'O' if self.current == 'X' else 'X'
+            self.history.append(move)
             return True
         return False
 
+    def undo_move(self):
+        r, c = self.history.pop()
+        self.board[r][c] = ' '
+        self.current = 'O' if self.current == 'X' else 'X'
+
     def winner(self):
         lines = []
         # Rows, columns, diagonals
@@ -0,0 +1,153 @@
+'''
+Tabela de jogo perfeito do jogo da velha, calculada uma única vez.
+
+Cada tabuleiro é codificado em base 3 (casa i = linha * 3 + coluna vale
+3**i; vazia = 0, 'X' = 1, 'O' = 2), o que dá 3**9 = 19683 códigos. Entre as
+8 simetrias do tabuleiro (rotações e reflexões), o menor código é o
+representante canônico, e só ele é guardado.
+
+A tabela é um arquivo de 19683 bytes indexado diretamente pelo código
+canônico. Cada byte guarda o valor da posição (+1 vitória de 'X', -1 de 'O',
+0 empate) e a melhor jogada na orientação canônica:
+(valor + 1) << 4 | casa. Posições não alcançáveis, não canônicas ou
+terminais ficam com NO_ENTRY. O arquivo é gerado na primeira consulta (ou
+com `python tic_tac_toe_db.py`) e aberto com mmap, de modo que consultar
+uma jogada é calcular 8 códigos e ler um byte.
+'''
+import mmap
+import os
+
+from tic_tac_toe import TicTacToe
+
+DB_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'tic_tac_toe.db')
+SIZE = 3 ** 9
+NO_ENTRY = 0xFF
+
+CODES = {' ': 0, 'X': 1, 'O': 2}
+LINES = [(0, 1, 2), (3, 4, 5), (6, 7, 8), (0, 3, 6), (1, 4, 7), (2, 5, 8), (0, 4, 8), (2, 4, 6)]
+
+
+def _symmetries():
+    # Cada simetria é uma tupla P em que a casa i do tabuleiro transformado é a casa P[i] do original
+    def perm(f):
+        return tuple(f(i // 3, i % 3)[0] * 3 + f(i // 3, i % 3)[1] for i in range(9))
+    rotations = [perm(lambda r, c: (r, c)), perm(lambda r, c: (2 - c, r)),
+                 perm(lambda r, c: (2 - r, 2 - c)), perm(lambda r, c: (c, 2 - r))]
+    mirror = perm(lambda r, c: (r, 2 - c))
+    return rotations + [tuple(p[mirror[i]] for i in range(9)) for p in rotations]
+
+
+SYMMETRIES = _symmetries()
+POWERS = [3 ** i for i in range(9)]
+
+
+def _cells(game):
+    return [CODES[cell] for row in game.board for cell in row]
+
+
+def canonical(cells):
+    '''Devolve (código canônico, simetria usada) de uma lista de 9 códigos de casa.'''
+    return min((sum(cells[p[i]] * POWERS[i] for i in range(9)), p) for p in SYMMETRIES)
+
+
+def _winner(cells):
+    for a, b, c in LINES:
+        if cells[a] and cells[a] == cells[b] == cells[c]:
+            return cells[a]
+    return 0
+
+
+def solve():
+    '''
+    Percorre todas as posições alcançáveis a partir do tabuleiro vazio e
+    devolve a tabela (bytearray de SIZE bytes).
+    '''
+    table = bytearray([NO_ENTRY]) * SIZE
+    # Valor com distância (vitórias rápidas valem mais) por código canônico
+    scores = {}
+
+    def search(cells, player):
+        code, _ = canonical(cells)
+        if code in scores:
+            return scores[code]
+        winner = _winner(cells)
+        if winner:
+            score = 10 if winner == 1 else -10
+        elif all(cells):
+            score = 0
+        else:
+            best = None
+            for i in range(9):
+                if cells[i]:
+                    continue
+                cells[i] = player
+                child = search(cells, 3 - player)
+                cells[i] = 0
+                # Um ponto a menos por jogada até o fim, mantendo o sinal
+                child -= (child > 0) - (child < 0)
+                if best is None or (child > best[0] if player == 1 else child < best[0]):
+                    best = (child, i)
+            score = best[0]
+            # A melhor jogada é guardada na orientação canônica
+            _, p = canonical(cells)
+            canonical_move = p.index(best[1])
+            value = (score > 0) - (score < 0)
+            table[code] = (value + 1) << 4 | canonical_move
+        scores[code] = score
+        return score
+
+    search([0] * 9, 1)
+    return table
+
+
+def build_database(path=DB_PATH):
+    '''Resolve o jogo e grava a tabela em `path`.'''
+    table = solve()
+    # Gravada com outro nome e renomeada: um processo que abra o arquivo ao
+    # mesmo tempo nunca vê uma tabela vazia ou pela metade
+    partial = f'{path}.{os.getpid()}'
+    with open(partial, 'wb') as f:
+        f.write(table)
+    os.replace(partial, path)
+    return path
+
+
+def ensure_database(path=DB_PATH):
+    '''Gera a tabela em `path` se ela ainda não existir (ou estiver incompleta).'''
+    if not os.path.exists(path) or os.path.getsize(path) != SIZE:
+        build_database(path)
+    return path
+
+
+_table = None
+
+
+def _open_table(path=DB_PATH):
+    global _table
+    if _table is None:
+        ensure_database(path)
+        with open(path, 'rb') as f:
+            _table = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    return _table
+
+
+def lookup(game):
+    '''Devolve (valor, jogada) da posição de `game`, ou None se ela não estiver na tabela.'''
+    cells = _cells(game)
+    code, p = canonical(cells)
+    entry = _open_table()[code]
+    if entry == NO_ENTRY:
+        return None
+    move = p[entry & 15]
+    return (entry >> 4) - 1, (move // 3, move % 3)
+
+
+def lookup_best_move(game):
+    '''Melhor jogada (linha, coluna) para quem joga em `game`, ou None se o jogo acabou.'''
+    entry = lookup(game)
+    return entry[1] if entry else None
+
+
+if __name__ == '__main__':
+    print(f"Tabela gravada em {build_database()}")
+    print(f"Jogada inicial: {lookup_best_move(TicTacToe())}")
@@ -0,0 +1,55 @@
+import random
+
+# Tipos de limite guardados em cada entrada
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+def zobrist_keys(cells, pieces=2, seed=2024):
+    '''
+    Gera a tabela de chaves de Zobrist: um inteiro aleatório de 64 bits para
+    cada par (casa, peça). O hash de uma posição é o XOR das chaves das peças
+    presentes, de modo que colocar ou retirar uma peça atualiza o hash com um
+    único XOR.
+    '''
+    rng = random.Random(seed)
+    return [[rng.getrandbits(64) for _ in range(pieces)] for _ in range(cells)]
+
+
+class TranspositionTable:
+    '''
+    Tabela de transposição de tamanho fixo, indexada pelos bits menos
+    significativos do hash de Zobrist.
+
+    Cada entrada é uma tupla (hash, profundidade, valor, limite, melhor jogada,
+    geração). Há uma entrada por posição da tabela, o que limita a memória a
+    `size` entradas. Política de substituição: uma entrada é sobrescrita se
+    pertencer a uma busca anterior (geração mais antiga) ou se a nova busca for
+    pelo menos tão profunda quanto a guardada.
+
+    A tabela pode ser mantida entre jogadas de uma mesma partida; chame
+    new_search() antes de cada busca para envelhecer as entradas antigas.
+    '''
+    def __init__(self, size=1 << 18):
+        if size & (size - 1):
+            raise ValueError("O tamanho da tabela deve ser uma potência de 2.")
+        self.mask = size - 1
+        self.slots = [None] * size
+        self.generation = 0
+
+    def new_search(self):
+        self.generation += 1
+
+    def lookup(self, key):
+        entry = self.slots[key & self.mask]
+        if entry is not None and entry[0] == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, best_move):
+        index = key & self.mask
+        old = self.slots[index]
+        if old is None or old[5] != self.generation or depth >= old[1]:
+            self.slots[index] = (key, depth, score, flag, best_move, self.generation)
+
+    def clear(self):
+        self.slots = [None] * len(self.slots)
@@ -0,0 +1,134 @@
+"""
+Compares the A* frontier before and after the indexed priority queue, on
+the A* (q3) and food heuristic (q6) test cases.
+
+The baseline is the previous aStarSearch: a util.PriorityQueue where a
+cheaper route to a successor pushes a duplicate entry and stale entries are
+skipped when popped. search.aStarSearch keeps each state once in a
+util.IndexedPriorityQueue and lowers its key instead. For each test the
+script reports the states expanded, the peak and total number of heap
+entries, and the expansions per second. Food layouts with more than
+MAX_FOOD pellets are skipped: the autograder only evaluates the heuristic
+on them, and a full A* solve does not finish in reasonable time.
+
+Usage: python benchmark_astar.py [test_cases/q3 test_cases/q6 ...]
+"""
+import os
+import sys
+import time
+
+import layout
+import pacman
+import search
+import searchAgents
+import util
+from searchTestClasses import GraphSearch, parseHeuristic
+from testParser import TestParser
+
+MAX_FOOD = 16
+
+
+def lazyAStarSearch(problem, heuristic=search.nullHeuristic):
+    """The previous A*, with duplicate heap entries and lazy deletion (baseline)."""
+    frontier = util.PriorityQueue()
+    start_state = problem.getStartState()
+    nodes = search.SearchNodes()
+    frontier.push(nodes.add(start_state), heuristic(start_state, problem))
+    visited = dict()
+    while not frontier.isEmpty():
+        node = frontier.pop()
+        state, cost = nodes.states[node], nodes.costs[node]
+        if state in visited and visited[state] <= cost:
+            continue
+        visited[state] = cost
+        if problem.isGoalState(state):
+            return nodes.path(node)
+        for successor, action, step_cost in problem.expand(state):
+            new_cost = cost + step_cost
+            if successor not in visited or visited[successor] > new_cost:
+                priority = new_cost + heuristic(successor, problem)
+                frontier.push(nodes.add(successor, node, action, new_cost), priority)
+    return []
+
+
+class CountingQueue:
+    """Mixin recording the number of pushes and the peak heap size."""
+    pushes = 0
+    peak = 0
+
+    def push(self, item, priority):
+        super().push(item, priority)
+        CountingQueue.pushes += 1
+        CountingQueue.peak = max(CountingQueue.peak, len(self.heap))
+
+
+class CountingPriorityQueue(CountingQueue, util.PriorityQueue):
+    pass
+
+
+class CountingIndexedPriorityQueue(CountingQueue, util.IndexedPriorityQueue):
+    pass
+
+
+def loadCases(directories):
+    """Yields (name, problem factory, heuristic) for every A* test with a layout or graph."""
+    for directory in directories:
+        for fileName in sorted(os.listdir(directory)):
+            if not fileName.endswith('.test'):
+                continue
+            testDict = TestParser(os.path.join(directory, fileName)).parse()
+            name = os.path.join(os.path.basename(directory), fileName[:-len('.test')])
+            if 'graph' in testDict:
+                if testDict.get('algorithm') != 'aStarSearch':
+                    continue
+                heuristic = search.nullHeuristic
+                if 'heuristic' in testDict:
+                    heuristic = parseHeuristic(testDict['heuristic'])
+                yield name, (lambda graph=testDict['graph']: GraphSearch(graph)), heuristic
+            elif 'layout' in testDict:
+                if testDict.get('algorithm', 'aStarSearch') != 'aStarSearch':
+                    continue
+                if testDict['layout'].count('.') > MAX_FOOD:
+                    continue
+                lay = layout.Layout([l.strip() for l in testDict['layout'].split('\n')])
+                gameState = pacman.GameState()
+                gameState.initialize(lay, 0)
+                problemClass = getattr(searchAgents, testDict.get('searchProblemClass', 'PositionSearchProblem'))
+                heuristic = getattr(searchAgents, testDict.get('heuristic', 'nullHeuristic'), search.nullHeuristic)
+                yield name, (lambda c=problemClass, g=gameState: c(g)), heuristic
+
+
+def measure(algorithm, makeProblem, heuristic):
+    CountingQueue.pushes = CountingQueue.peak = 0
+    problem = makeProblem()
+    start = time.perf_counter()
+    path = algorithm(problem, heuristic)
+    elapsed = time.perf_counter() - start
+    expanded = getattr(problem, '_expanded', None)
+    if expanded is None:
+        expanded = len(problem.getExpandedStates())
+    return {'cost': problem.getCostOfActionSequence(path), 'expanded': expanded,
+            'pushes': CountingQueue.pushes, 'peak': CountingQueue.peak, 'time': elapsed}
+
+
+def main(directories):
+    # search.py looks the queue classes up in util at call time
+    util.PriorityQueue, util.IndexedPriorityQueue = CountingPriorityQueue, CountingIndexedPriorityQueue
+    header = '%-32s %9s | %8s %8s %10s | %8s %8s %10s' % (
+        'test', 'expanded', 'peak', 'pushes', 'nodes/s', 'peak', 'pushes', 'nodes/s')
+    print('%43s | %-28s | %s' % ('', 'lazy deletion', 'decrease-key'))
+    print(header)
+    print('-' * len(header))
+    for name, makeProblem, heuristic in loadCases(directories):
+        old = measure(lazyAStarSearch, makeProblem, heuristic)
+        new = measure(search.aStarSearch, makeProblem, heuristic)
+        assert old['cost'] == new['cost'], name
+        rate = lambda r: r['expanded'] / r['time'] if r['time'] else float('inf')
+        print('%-32s %9d | %8d %8d %10.0f | %8d %8d %10.0f' % (
+            name, new['expanded'], old['peak'], old['pushes'], rate(old),
+            new['peak'], new['pushes'], rate(new)))
+
+
+if __name__ == '__main__':
+    here = os.path.dirname(os.path.abspath(__file__))
+    main(sys.argv[1:] or [os.path.join(here, 'test_cases', 'q3'), os.path.join(here, 'test_cases', 'q6')])
@@ -159,11 +159,31 @@ class AgentState:
     def getDirection(self):
         return self.configuration.getDirection()
 
+class _GridColumn(list):
+    """
+    A column handed out by Grid.__getitem__: a list that records writes in
+    the grid's set of dirty columns, so they are folded back into its bits.
+    """
+    __slots__ = ('x', 'dirtyColumns')
+
+    def __setitem__(self, y, value):
+        list.__setitem__(self, y, value)
+        self.dirtyColumns.add(self.x)
+
 class Grid:
     """
-    A 2-dimensional array of objects backed by a list of lists.  Data is accessed
-    via grid[x][y] where (x,y) are positions on a Pacman map with x horizontal,
-    y vertical and the origin (0,0) in the bottom left corner.
+    A 2-dimensional array of booleans backed by a single Python int.  Data is
+    accessed via grid[x][y] where (x,y) are positions on a Pacman map with x
+    horizontal, y vertical and the origin (0,0) in the bottom left corner.
+
+    Cell (x,y) is bit x * height + y of self.bits.  Since ints are immutable,
+    copy() just shares the int (copy-on-write), count() is a popcount, the hash
+    is the int itself and asList() only visits the set bits.
+
+    grid[x] is a list with the column's values, built on first access so that
+    grid[x][y] reads stay list lookups.  Writes through a column mark it dirty,
+    and only dirty columns are folded back into the int (O(height) each) when
+    self.bits is next read; with no pending writes reading the bits is O(1).
 
     The __str__ method constructs an output that is oriented like a pacman board.
     """
@@ -173,57 +193,82 @@ class Grid:
 
         self.width = width
         self.height = height
-        self.data = [[initialValue for y in range(height)] for x in range(width)]
+        self._bits = (1 << (width * height)) - 1 if initialValue else 0
+        self._columns = [None] * width
+        self._dirtyColumns = set()
         if bitRepresentation:
             self._unpackBits(bitRepresentation)
 
+    @property
+    def bits(self):
+        if self._dirtyColumns:
+            bits, height = self._bits, self.height
+            columnMask = (1 << height) - 1
+            for x in self._dirtyColumns:
+                column = 0
+                for y, value in enumerate(self._columns[x]):
+                    if value:
+                        column |= 1 << y
+                bits = bits & ~(columnMask << x * height) | column << x * height
+            self._bits = bits
+            self._dirtyColumns.clear()
+        return self._bits
+
+    @bits.setter
+    def bits(self, bits):
+        self._bits = bits
+        self._columns = [None] * self.width
+        self._dirtyColumns = set()
+
     def __getitem__(self, i):
-        return self.data[i]
+        column = self._columns[i]
+        if column is None:
+            x = i % self.width
+            column = self._bits >> x * self.height
+            column = self._columns[x] = _GridColumn(column >> y & 1 == 1 for y in range(self.height))
+            column.x, column.dirtyColumns = x, self._dirtyColumns
+        return column
 
     def __setitem__(self, key, item):
-        self.data[key] = item
+        self[key][:] = item
 
     def __str__(self):
-        out = [[str(self.data[x][y])[0] for x in range(self.width)] for y in range(self.height)]
+        out = [[str(self[x][y])[0] for x in range(self.width)] for y in range(self.height)]
         out.reverse()
         return '\n'.join([''.join(x) for x in out])
 
     def __eq__(self, other):
         if other == None: return False
-        return self.data == other.data
+        return self.bits == other.bits and self.width == other.width and self.height == other.height
 
     def __hash__(self):
-        # return hash(str(self))
-        base = 1
-        h = 0
-        for l in self.data:
-            for i in l:
-                if i:
-                    h += base
-                base *= 2
-        return hash(h)
+        # same value as summing 2 ** (x * height + y) over the set cells
+        return hash(self.bits)
 
     def copy(self):
         g = Grid(self.width, self.height)
-        g.data = [x[:] for x in self.data]
+        g._bits = self.bits
         return g
 
     def deepCopy(self):
         return self.copy()
 
     def shallowCopy(self):
-        g = Grid(self.width, self.height)
-        g.data = self.data
-        return g
+        # The int cannot be shared mutably: writes to a shallow copy are not
+        # seen by the original (the game always copies before writing anyway).
+        return self.copy()
 
     def count(self, item =True ):
-        return sum([x.count(item) for x in self.data])
+        ones = bin(self.bits).count('1')
+        return ones if item else self.width * self.height - ones
 
     def asList(self, key = True):
+        bits = self.bits if key else ~self.bits & ((1 << (self.width * self.height)) - 1)
         list = []
-        for x in range(self.width):
-            for y in range(self.height):
-                if self[x][y] == key: list.append( (x,y) )
+        while bits:
+            low = bits & -bits
+            list.append(self._cellIndexToPosition(low.bit_length() - 1))
+            bits ^= low
         return list
 
     def packBits(self):
@@ -233,16 +278,12 @@ class Grid:
         (width, height, bitPackedInts...)
         """
         bits = [self.width, self.height]
-        currentInt = 0
-        for i in range(self.height * self.width):
-            bit = self.CELLS_PER_INT - (i % self.CELLS_PER_INT) - 1
-            x, y = self._cellIndexToPosition(i)
-            if self[x][y]:
-                currentInt += 2 ** bit
-            if (i + 1) % self.CELLS_PER_INT == 0:
-                bits.append(currentInt)
-                currentInt = 0
-        bits.append(currentInt)
+        size = self.height * self.width
+        value = self.bits
+        for start in range(0, size + 1, self.CELLS_PER_INT):
+            # cell start + i goes to bit CELLS_PER_INT - i - 1 of the packed int
+            chunk = value >> start & ((1 << self.CELLS_PER_INT) - 1)
+            bits.append(int(format(chunk, '0%db' % self.CELLS_PER_INT)[::-1], 2))
         return tuple(bits)
 
     def _cellIndexToPosition(self, index):
@@ -254,13 +295,14 @@ class Grid:
         """
         Fills in data from a bit-level representation
         """
-        cell = 0
-        for packed in bits:
-            for bit in self._unpackInt(packed, self.CELLS_PER_INT):
-                if cell == self.width * self.height: break
-                x, y = self._cellIndexToPosition(cell)
-                self[x][y] = bit
-                cell += 1
+        size = self.width * self.height
+        value = 0
+        for chunk, packed in enumerate(bits):
+            for i, bit in enumerate(self._unpackInt(packed, self.CELLS_PER_INT)):
+                cell = chunk * self.CELLS_PER_INT + i
+                if bit and cell < size:
+                    value |= 1 << cell
+        self.bits = value
 
     def _unpackInt(self, packed, size):
         bools = []
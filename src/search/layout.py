@@ -47,7 +47,9 @@ class Layout:
             from game import Directions
             vecs = [(-0.5,0), (0.5,0),(0,-0.5),(0,0.5)]
             dirs = [Directions.NORTH, Directions.SOUTH, Directions.WEST, Directions.EAST]
-            vis = Grid(self.width, self.height, {Directions.NORTH:set(), Directions.SOUTH:set(), Directions.EAST:set(), Directions.WEST:set(), Directions.STOP:set()})
+            # Grid only holds booleans: every cell gets its own dict of visible positions per direction
+            allDirs = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST, Directions.STOP]
+            vis = [[dict((d, set()) for d in allDirs) for y in range(self.height)] for x in range(self.width)]
             for x in range(self.width):
                 for y in range(self.height):
                     if self.walls[x][y] == False:
@@ -56,7 +58,7 @@ class Layout:
                             nextx, nexty = x + dx, y + dy
                             while (nextx + nexty) != int(nextx) + int(nexty) or not self.walls[int(nextx)][int(nexty)] :
                                 vis[x][y][direction].add((nextx, nexty))
-                                nextx, nexty = x + dx, y + dy
+                                nextx, nexty = nextx + dx, nexty + dy
             self.visibility = vis
             VISIBILITY_MATRIX_CACHE[reduce(str.__add__, self.layoutText)] = vis
         else:
@@ -0,0 +1,144 @@
+"""
+Maze distance oracle shared by the search agents and heuristics.
+
+MazeDistances numbers the open cells of a walls grid and keeps the BFS
+distance between every pair of them in a NumPy uint16 matrix. Rows are
+filled lazily: the first query from a source runs one BFS over the cell
+graph, and every later query from (or to) that source is a table lookup.
+getMazeDistances() keeps one oracle per layout in a small LRU keyed by the
+walls, so all problems and agents on the same layout share it.
+"""
+
+from collections import OrderedDict
+
+import numpy as np
+
+from game import Actions, Directions
+
+# Distance stored for cells that cannot reach each other
+UNREACHABLE = np.iinfo(np.uint16).max
+
+# Same action order as PositionSearchProblem.getActions
+ACTIONS = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
+
+# Number of layouts kept by getMazeDistances
+MAX_LAYOUTS = 8
+
+
+class MazeDistances:
+    """
+    All-pairs maze distances of a layout, computed one source at a time.
+    """
+    def __init__(self, walls):
+        self.width, self.height = walls.width, walls.height
+        self.cells = walls.asList(False)
+        self.index = {cell: i for i, cell in enumerate(self.cells)}
+        # (action, neighbour index) of each open cell
+        self.neighbors = []
+        for x, y in self.cells:
+            moves = []
+            for action in ACTIONS:
+                dx, dy = Actions.directionToVector(action)
+                neighbor = self.index.get((int(x + dx), int(y + dy)))
+                if neighbor is not None:
+                    moves.append((action, neighbor))
+            self.neighbors.append(moves)
+        self.matrix = np.full((len(self.cells), len(self.cells)), UNREACHABLE, dtype=np.uint16)
+        self.computed = bytearray(len(self.cells))
+
+    def _bfs(self, source):
+        distances = [UNREACHABLE] * len(self.cells)
+        distances[source] = 0
+        layer, depth = [source], 0
+        while layer:
+            depth += 1
+            nextLayer = []
+            for cell in layer:
+                for _, neighbor in self.neighbors[cell]:
+                    if distances[neighbor] == UNREACHABLE:
+                        distances[neighbor] = depth
+                        nextLayer.append(neighbor)
+            layer = nextLayer
+        self.matrix[source] = distances
+        self.computed[source] = 1
+
+    def row(self, position):
+        """Distances from `position` to every open cell, indexed like self.cells."""
+        i = self.index[position]
+        if not self.computed[i]:
+            self._bfs(i)
+        return self.matrix[i]
+
+    def distance(self, point1, point2):
+        """Maze distance between two open cells (UNREACHABLE if there is no path)."""
+        i, j = self.index[point1], self.index[point2]
+        if not self.computed[i]:
+            if self.computed[j]:
+                return int(self.matrix[j, i])
+            self._bfs(i)
+        return int(self.matrix[i, j])
+
+    def distancesTo(self, position, targets):
+        """Array with the maze distance from `position` to each cell in `targets`."""
+        index = self.index
+        return self.row(position)[[index[target] for target in targets]]
+
+    def spanningTreeCost(self, cells):
+        """
+        Cost of a minimum spanning tree over `cells` with maze distances as
+        edge weights (Prim's algorithm on the distance submatrix).
+        """
+        index = [self.index[cell] for cell in cells]
+        for i in index:
+            if not self.computed[i]:
+                self._bfs(i)
+        weights = self.matrix[np.ix_(index, index)].astype(np.int64)
+        inTree = np.zeros(len(index), dtype=bool)
+        inTree[0] = True
+        best = weights[0].copy()
+        total = 0
+        for _ in range(len(index) - 1):
+            nearest = int(np.argmin(np.where(inTree, np.iinfo(np.int64).max, best)))
+            total += int(best[nearest])
+            inTree[nearest] = True
+            np.minimum(best, weights[nearest], out=best)
+        return total
+
+    def path(self, start, goal):
+        """A shortest list of actions from `start` to `goal`, or None if unreachable."""
+        toGoal = self.row(goal)
+        cell = self.index[start]
+        if toGoal[cell] == UNREACHABLE:
+            return None
+        actions = []
+        while toGoal[cell]:
+            # every step goes to a neighbour one move closer to the goal
+            for action, neighbor in self.neighbors[cell]:
+                if toGoal[neighbor] < toGoal[cell]:
+                    actions.append(action)
+                    cell = neighbor
+                    break
+        return actions
+
+
+_oracles = OrderedDict()
+_last = (None, None)
+
+
+def getMazeDistances(walls):
+    """The MazeDistances of a walls grid, shared by every caller with the same walls."""
+    global _last
+    # the layout's walls grid is the same object in every game state
+    if _last[0] is walls:
+        return _last[1]
+    key = walls.packBits()
+    oracle = _oracles.get(key)
+    if oracle is None:
+        oracle = MazeDistances(walls)
+        _oracles[key] = oracle
+        if len(_oracles) > MAX_LAYOUTS:
+            _oracles.popitem(last=False)
+    else:
+        _oracles.move_to_end(key)
+    _last = (walls, oracle)
+    return oracle
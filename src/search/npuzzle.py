@@ -0,0 +1,358 @@
+"""
+N-puzzle (8, 15 and 24 puzzle) with packed integer states and additive
+pattern database heuristics.
+
+A puzzle of side `size` has size*size cells numbered row by row; the goal
+has the blank in cell 0 and tile t in cell t, as in eightpuzzle.py. A state
+is a single int with cellBits bits per field: the low field is the cell of
+the blank and field c+1 holds the tile in cell c, so a move is a few shifts
+and additions instead of copying a list of lists.
+
+PatternDatabase splits the tiles into disjoint groups. For each group a
+backward breadth-first search from the goal over the positions of the group's
+tiles and the blank counts only the moves of the group's tiles, and keeps the
+minimum over the blank position for each placement of the tiles. Each move
+moves a single tile, so the values of the groups can be added and the sum is
+still admissible. The tables are built once, saved as NumPy uint8 arrays in
+PATTERN_DATABASE_DIR and memory-mapped when loaded.
+
+Usage: python npuzzle.py [size [moves]]
+  Solves a random puzzle (a uniformly random solvable one, or `moves` random
+  moves from the goal) with A* and IDA* using the pattern databases.
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+import search
+
+# Blank moves, in the same order as EightPuzzleState.legalMoves
+ACTIONS = [('up', -1, 0), ('down', 1, 0), ('left', 0, -1), ('right', 0, 1)]
+
+# Disjoint tile groups of each puzzle size: 4-4, 5-5-5 and six groups of 4
+DEFAULT_PATTERNS = {
+    3: [(1, 2, 4, 5), (3, 6, 7, 8)],
+    4: [(1, 2, 3, 6, 7), (4, 5, 8, 9, 12), (10, 11, 13, 14, 15)],
+    5: [(1, 2, 6, 7), (3, 4, 8, 9), (5, 10, 15, 20),
+        (11, 12, 16, 17), (13, 14, 18, 19), (21, 22, 23, 24)],
+}
+
+# Where the pattern database tables are stored
+PATTERN_DATABASE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'patternDatabases')
+
+# Table entry of tile placements that cannot occur (two tiles in one cell)
+UNSEEN = np.iinfo(np.uint8).max
+
+
+def neighborCells(size):
+    """For each cell, the (action, neighbour cell) pairs of the blank in that cell."""
+    moves = []
+    for cell in range(size * size):
+        row, col = divmod(cell, size)
+        moves.append([(action, (row + dRow) * size + col + dCol)
+                      for action, dRow, dCol in ACTIONS
+                      if 0 <= row + dRow < size and 0 <= col + dCol < size])
+    return moves
+
+
+def isSolvable(tiles):
+    """
+    Whether the goal can be reached from `tiles` (row-major, 0 for the blank):
+    every move is a transposition that moves the blank to a cell of the other
+    colour, so the permutation parity must match the parity of the blank's
+    distance to cell 0.
+    """
+    size = int(round(len(tiles) ** 0.5))
+    seen, transpositions = [False] * len(tiles), 0
+    for cell in range(len(tiles)):
+        length = 0
+        while not seen[cell]:
+            seen[cell] = True
+            cell = tiles[cell]
+            length += 1
+        transpositions += max(length - 1, 0)
+    blank = list(tiles).index(0)
+    return transpositions % 2 == (blank // size + blank % size) % 2
+
+
+def randomPuzzle(size, moves=None):
+    """
+    Tiles (row-major) of a random solvable puzzle: uniformly random, or
+    `moves` random blank moves away from the goal.
+    """
+    if moves is None:
+        tiles = list(range(size * size))
+        while True:
+            random.shuffle(tiles)
+            if isSolvable(tiles):
+                return tiles
+    tiles = list(range(size * size))
+    neighbors = neighborCells(size)
+    blank = 0
+    for _ in range(moves):
+        _, cell = random.choice(neighbors[blank])
+        tiles[blank], tiles[cell] = tiles[cell], 0
+        blank = cell
+    return tiles
+
+
+def puzzleToString(tiles):
+    """ASCII drawing of a puzzle in the style of EightPuzzleState."""
+    size = int(round(len(tiles) ** 0.5))
+    width = len(str(len(tiles) - 1))
+    line = '-' * ((width + 3) * size + 1)
+    lines = [line]
+    for row in range(size):
+        cells = [str(tile).rjust(width) if tile else ' ' * width
+                 for tile in tiles[row * size:(row + 1) * size]]
+        lines.append('| ' + ' | '.join(cells) + ' |')
+        lines.append(line)
+    return '\n'.join(lines)
+
+
+class NPuzzleSearchProblem(search.SearchProblem):
+    """
+    SearchProblem of the N-puzzle with packed integer states (see the module
+    docstring). `tiles` lists the tile in each cell row by row, 0 for the blank.
+    """
+    def __init__(self, tiles):
+        self.size = int(round(len(tiles) ** 0.5))
+        self.cells = self.size * self.size
+        if sorted(tiles) != list(range(self.cells)):
+            raise ValueError('tiles must be a permutation of 0..%d' % (self.cells - 1))
+        self.cellBits = (self.cells - 1).bit_length()
+        self.cellMask = (1 << self.cellBits) - 1
+        self.moves = neighborCells(self.size)
+        self.start = self.packState(tiles)
+        self.goal = self.packState(range(self.cells))
+        self._expanded = 0
+        self.heuristicInfo = {}
+
+    def packState(self, tiles):
+        """Packed state of a row-major list of tiles."""
+        tiles = list(tiles)
+        state = tiles.index(0)
+        for cell, tile in enumerate(tiles):
+            state |= tile << ((cell + 1) * self.cellBits)
+        return state
+
+    def unpackState(self, state):
+        """Row-major list of tiles of a packed state."""
+        bits, mask = self.cellBits, self.cellMask
+        return [(state >> ((cell + 1) * bits)) & mask for cell in range(self.cells)]
+
+    def tilePositions(self, state):
+        """Cell of each tile, indexed by tile (index 0 is the blank)."""
+        bits, mask = self.cellBits, self.cellMask
+        positions = [0] * self.cells
+        state >>= bits
+        for cell in range(self.cells):
+            positions[state & mask] = cell
+            state >>= bits
+        return positions
+
+    def getStartState(self):
+        return self.start
+
+    def isGoalState(self, state):
+        return state == self.goal
+
+    def expand(self, state):
+        """
+        Returns list of (child, action, stepCost) pairs, one for each move of
+        the blank, with cost 1.
+        """
+        self._expanded += 1
+        bits, mask = self.cellBits, self.cellMask
+        blank = state & mask
+        blankShift = (blank + 1) * bits
+        children = []
+        for action, cell in self.moves[blank]:
+            # the tile in `cell` moves to the blank's cell and the blank takes its place
+            shift = (cell + 1) * bits
+            tile = (state >> shift) & mask
+            child = state - (tile << shift) + (tile << blankShift) - blank + cell
+            children.append((child, action, 1))
+        return children
+
+    def getActions(self, state):
+        return [action for action, _ in self.moves[state & self.cellMask]]
+
+    def getActionCost(self, state, action, next_state):
+        assert next_state == self.getNextState(state, action), (
+            "getActionCost() called on incorrect next state.")
+        return 1
+
+    def getNextState(self, state, action):
+        for child, childAction, _ in self.expand(state):
+            if childAction == action:
+                self._expanded -= 1
+                return child
+        raise AssertionError("getNextState() called on incorrect action")
+
+    def getCostOfActionSequence(self, actions):
+        """
+        Returns the number of moves, checking that each one is legal from the
+        start state.
+        """
+        state = self.start
+        for action in actions:
+            state = self.getNextState(state, action)
+        return len(actions)
+
+
+class PatternDatabase:
+    """
+    Additive disjoint pattern databases of one puzzle size. Table i holds, for
+    each placement of the tiles of patterns[i] (cell of the first tile as the
+    most significant base-cells digit), the moves of those tiles needed to
+    reach the goal. Missing tables are built and saved on first use.
+    """
+    def __init__(self, size, patterns=None, directory=PATTERN_DATABASE_DIR):
+        self.size = size
+        self.cells = size * size
+        self.patterns = [tuple(pattern) for pattern in (patterns or DEFAULT_PATTERNS[size])]
+        tiles = [tile for pattern in self.patterns for tile in pattern]
+        if len(tiles) != len(set(tiles)) or not all(0 < tile < self.cells for tile in tiles):
+            raise ValueError('patterns must be disjoint groups of tiles 1..%d' % (self.cells - 1))
+        self.directory = directory
+        self.tables = [self._load(pattern) for pattern in self.patterns]
+        # (tile, weight of its cell in the table index) of each pattern
+        self.weights = [[(tile, self.cells ** (len(pattern) - 1 - i)) for i, tile in enumerate(pattern)]
+                        for pattern in self.patterns]
+
+    def fileName(self, pattern):
+        return os.path.join(self.directory, 'npuzzle%d_%s.npy' % (self.cells, '-'.join(map(str, pattern))))
+
+    def _load(self, pattern):
+        fileName = self.fileName(pattern)
+        if not os.path.exists(fileName):
+            table = buildPatternTable(self.size, pattern)
+            os.makedirs(self.directory, exist_ok=True)
+            # written under another name first, so a concurrent reader never sees half a table
+            partial = '%s.%d.npy' % (fileName[:-len('.npy')], os.getpid())
+            np.save(partial, table)
+            os.replace(partial, fileName)
+        return np.load(fileName, mmap_mode='r')
+
+    def value(self, positions):
+        """Sum of the tables for `positions` (cell of each tile, as in tilePositions)."""
+        total = 0
+        for table, weights in zip(self.tables, self.weights):
+            index = 0
+            for tile, weight in weights:
+                index += positions[tile] * weight
+            total += table.item(index)
+        return total
+
+
+def buildPatternTable(size, pattern):
+    """
+    Table of one pattern: breadth-first search backwards from the goal over
+    (cells of the pattern's tiles, cell of the blank), where moving a pattern
+    tile costs 1 and moving any other tile costs 0, then the minimum over the
+    blank's cell. Each layer is processed as a NumPy array of abstract states.
+    """
+    cells = size * size
+    k = len(pattern)
+    neighbors = np.full((cells, len(ACTIONS)), -1, dtype=np.int8)
+    for cell, moves in enumerate(neighborCells(size)):
+        for j, (_, neighbor) in enumerate(moves):
+            neighbors[cell, j] = neighbor
+    # index of an abstract state: its cells as base-`cells` digits, the blank last
+    radix = cells ** np.arange(k, -1, -1, dtype=np.int64)
+    distances = np.full(cells ** (k + 1), UNSEEN, dtype=np.uint8)
+
+    def visit(states, distance):
+        """Marks the unseen states and returns them, without duplicates."""
+        index = states.astype(np.int64) @ radix
+        index, first = np.unique(index, return_index=True)
+        new = distances[index] == UNSEEN
+        distances[index[new]] = distance
+        return states[first[new]]
+
+    def successors(states):
+        """(zero-cost, unit-cost) successors of an array of abstract states."""
+        free, moved = [], []
+        for j in range(len(ACTIONS)):
+            targets = neighbors[states[:, k], j]
+            valid = targets >= 0
+            children, targets = states[valid], targets[valid]
+            hit = children[:, :k] == targets[:, None]
+            rows, tiles = np.nonzero(hit)
+            # a pattern tile in the target cell moves into the blank's cell
+            children[rows, tiles] = children[rows, k]
+            children[:, k] = targets
+            isMove = hit.any(axis=1)
+            free.append(children[~isMove])
+            moved.append(children[isMove])
+        return np.concatenate(free), np.concatenate(moved)
+
+    layer = visit(np.array([list(pattern) + [0]], dtype=np.int8), 0)
+    distance = 0
+    while len(layer):
+        if distance + 1 >= UNSEEN:
+            raise ValueError('pattern %s needs more than %d moves' % (pattern, UNSEEN - 1))
+        # the blank moves freely among cells without pattern tiles at the same distance
+        reached, frontier = [layer], layer
+        while len(frontier):
+            frontier = visit(successors(frontier)[0], distance)
+            reached.append(frontier)
+        layer = np.concatenate(reached)
+        distance += 1
+        layer = visit(successors(layer)[1], distance)
+
+    return distances.reshape(-1, cells).min(axis=1)
+
+
+_databases = {}
+
+
+def getPatternDatabase(size, patterns=None):
+    """The PatternDatabase of a puzzle size and patterns, loaded once per process."""
+    key = (size, tuple(tuple(pattern) for pattern in (patterns or DEFAULT_PATTERNS[size])))
+    if key not in _databases:
+        _databases[key] = PatternDatabase(size, key[1])
+    return _databases[key]
+
+
+def patternDatabaseHeuristic(state, problem):
+    """Sum of the default pattern databases of the problem's size."""
+    database = problem.heuristicInfo.get('patternDatabase')
+    if database is None:
+        database = problem.heuristicInfo['patternDatabase'] = getPatternDatabase(problem.size)
+    return database.value(problem.tilePositions(state))
+
+
+def manhattanHeuristic(state, problem):
+    """Sum of the Manhattan distances of the tiles to their goal cells."""
+    size = problem.size
+    positions = problem.tilePositions(state)
+    total = 0
+    for tile in range(1, problem.cells):
+        row, col = divmod(positions[tile], size)
+        total += abs(row - tile // size) + abs(col - tile % size)
+    return total
+
+
+if __name__ == '__main__':
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 4
+    moves = int(sys.argv[2]) if len(sys.argv) > 2 else None
+    tiles = randomPuzzle(size, moves)
+    print('A random puzzle:')
+    print(puzzleToString(tiles))
+
+    start = time.perf_counter()
+    getPatternDatabase(size)
+    print('Pattern databases loaded in %.1fs' % (time.perf_counter() - start))
+
+    for name, solve in [('A*', search.aStarSearch), ('IDA*', search.iterativeDeepeningAStarSearch)]:
+        problem = NPuzzleSearchProblem(tiles)
+        start = time.perf_counter()
+        path = solve(problem, patternDatabaseHeuristic)
+        print('%s found a path of %d moves in %.2fs, expanding %d nodes' % (
+            name, problem.getCostOfActionSequence(path), time.perf_counter() - start, problem._expanded))
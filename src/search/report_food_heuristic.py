@@ -0,0 +1,68 @@
+"""
+Compares foodHeuristic (nearest food + minimum spanning tree over the
+remaining food) with the previous farthestFoodHeuristic (distance to the
+farthest food) on every food heuristic (q6) test layout.
+
+For each layout and heuristic, A* is run on a FoodSearchProblem and the
+script reports the path cost, the nodes expanded and the wall time. The
+farthest-food runs are skipped on layouts with more than MAX_FOOD pellets,
+where they do not finish in reasonable time.
+
+Usage: python report_food_heuristic.py [test_cases/q6 ...]
+"""
+import os
+import sys
+import time
+
+import layout
+import pacman
+import search
+import searchAgents
+from testParser import TestParser
+
+MAX_FOOD = 16
+
+
+def loadLayouts(directories):
+    """Yields (name, game state, food count) for every test with a layout."""
+    for directory in directories:
+        for fileName in sorted(os.listdir(directory)):
+            if not fileName.endswith('.test'):
+                continue
+            testDict = TestParser(os.path.join(directory, fileName)).parse()
+            if 'layout' not in testDict:
+                continue
+            lay = layout.Layout([l.strip() for l in testDict['layout'].split('\n')])
+            gameState = pacman.GameState()
+            gameState.initialize(lay, 0)
+            name = os.path.join(os.path.basename(directory), fileName[:-len('.test')])
+            yield name, gameState, gameState.getNumFood()
+
+
+def run(gameState, heuristic):
+    problem = searchAgents.FoodSearchProblem(gameState)
+    start = time.perf_counter()
+    path = search.aStarSearch(problem, heuristic)
+    return problem.getCostOfActionSequence(path), problem._expanded, time.perf_counter() - start
+
+
+def main(directories):
+    header = '%-32s %5s %5s | %9s %9s | %9s %9s' % (
+        'test', 'food', 'cost', 'expanded', 'time (s)', 'expanded', 'time (s)')
+    print('%45s | %-19s | %s' % ('', 'farthest food', 'nearest food + MST'))
+    print(header)
+    print('-' * len(header))
+    for name, gameState, food in loadLayouts(directories):
+        cost, expanded, elapsed = run(gameState, searchAgents.foodHeuristic)
+        if food <= MAX_FOOD:
+            oldCost, oldExpanded, oldElapsed = run(gameState, searchAgents.farthestFoodHeuristic)
+            assert oldCost == cost, name
+            old = '%9d %9.3f' % (oldExpanded, oldElapsed)
+        else:
+            old = '%9s %9s' % ('-', '-')
+        print('%-32s %5d %5d | %s | %9d %9.3f' % (name, food, cost, old, expanded, elapsed))
+
+
+if __name__ == '__main__':
+    here = os.path.dirname(os.path.abspath(__file__))
+    main(sys.argv[1:] or [os.path.join(here, 'test_cases', 'q6')])
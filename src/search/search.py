@@ -17,8 +17,11 @@ In search.py, you will implement generic search algorithms which are called by
 Pacman agents (in searchAgents.py).
 """
 
+import heapq
+from collections import deque
+from itertools import count
+
 import util
-from util import Queue
 
 
 class SearchProblem:
@@ -102,6 +105,44 @@ def tinyMazeSearch(problem):
     return  [s, s, w, s, w, w, s, w]
 
 
+class SearchNodes:
+    """
+    Arena of search nodes shared by depthFirstSearch, breadthFirstSearch and
+    aStarSearch. A node is an index into parallel lists holding its state,
+    parent index, action and path cost g, so the frontier stores small ints
+    and pushing a node costs O(1) instead of copying the action list. The
+    path is rebuilt by following parent indices only once a goal is found.
+    """
+    __slots__ = ('states', 'parents', 'actions', 'costs')
+
+    def __init__(self):
+        self.states = []
+        self.parents = []
+        self.actions = []
+        self.costs = []
+
+    def add(self, state, parent=-1, action=None, cost=0):
+        """Stores a node and returns its index (parent -1 marks the root)."""
+        self.states.append(state)
+        self.parents.append(parent)
+        self.actions.append(action)
+        self.costs.append(cost)
+        return len(self.states) - 1
+
+    def path(self, node):
+        """Actions from the root to `node`."""
+        path = []
+        parents, actions = self.parents, self.actions
+        while parents[node] != -1:
+            path.append(actions[node])
+            node = parents[node]
+        path.reverse()
+        return path
+
+    def __len__(self):
+        return len(self.states)
+
+
 # Questao 1 - DFS
 def depthFirstSearch(problem):
     """
@@ -116,17 +157,18 @@ def depthFirstSearch(problem):
     print("Start:", problem.getStartState())
     print("Is the start a goal?", problem.isGoalState(problem.getStartState()))
     """
-     # Pilha para DFS
+    # nós da busca (estado, pai, ação) guardados na arena
+    nodes = SearchNodes()
+    # Pilha para DFS, com os índices dos nós na arena
     frontier = util.Stack()
-    # inserindo cada nó
-    # cada nó é uma tupla (estado, caminho)
-    frontier.push((problem.getStartState(), []))
+    frontier.push(nodes.add(problem.getStartState()))
     visited = set()
 
     # enquanto houver nós na fronteira a serem explorados
     while not frontier.isEmpty():
         # removendo o nó do topo da pilha
-        state, path = frontier.pop()
+        node = frontier.pop()
+        state = nodes.states[node]
         # ignorando estados já visitados
         if state in visited:
             continue
@@ -134,15 +176,13 @@ def depthFirstSearch(problem):
 
         # Objetivo alcançado
         if problem.isGoalState(state):
-            return path
+            return nodes.path(node)
 
         # Expansão do nó
         for successor, action, _ in problem.expand(state):
-            # atualizando o caminho percorrido
             if successor not in visited:
-                new_path = path + [action]
-                # adiciona o novo nó na pilha para exploração
-                frontier.push((successor, new_path))
+                # adiciona o novo nó (filho do atual) na pilha para exploração
+                frontier.push(nodes.add(successor, node, action))
 
     # Caso não encontre solução
     return []
@@ -150,30 +190,100 @@ def depthFirstSearch(problem):
 # Questao 2 - BFS
 def breadthFirstSearch(problem):
     """Search the shallowest nodes in the search tree first."""
-    
-    # fila para controlar a fronteira (estrutura fifo da bfs)
-    frontier = Queue()
-    # adiciona o estado inicial com caminho vazio
-    frontier.push((problem.getStartState(), []))
-    # conjunto para armazenar os estados visitados e evitar revisitas
-    visited = set()
+
+    # fila fifo: deque tem append/popleft em O(1)
+    nodes = SearchNodes()
+    start = problem.getStartState()
+    frontier = deque([nodes.add(start)])
+    # estados já descobertos: cada estado entra na fila uma única vez
+    seen = {start}
     # enquanto houver nós na fronteira
-    while not frontier.isEmpty():
+    while frontier:
         # remove o primeiro nó da fila (mais antigo) para explorar
-        state, path = frontier.pop()
+        node = frontier.popleft()
+        state = nodes.states[node]
         # verifica se o estado atual é o objetivo
         if problem.isGoalState(state):
-            return path  # retorna o caminho de ações até o objetivo
-        # se ainda não visitamos
-        if state not in visited:
-            # marca como visitado
-            visited.add(state)
-            # expande o nó atual gerando seus sucessores
+            return nodes.path(node)  # retorna o caminho de ações até o objetivo
+        # expande o nó atual gerando seus sucessores
+        for successor, action, _ in problem.expand(state):
+            # o primeiro caminho encontrado até o sucessor é o mais curto
+            if successor not in seen:
+                seen.add(successor)
+                frontier.append(nodes.add(successor, node, action))
+
+    return []
+
+
+def _pathTo(parents, state):
+    """Reconstrói as ações do estado inicial até `state` seguindo os ponteiros para o pai."""
+    path = []
+    while parents[state] is not None:
+        state, action = parents[state]
+        path.append(action)
+    path.reverse()
+    return path
+
+
+def bidirectionalSearch(problem):
+    """
+    Breadth-first search from the start and from the goal at the same time,
+    for problems with a single explicit goal (problem.goal) and reversible
+    unit-cost actions, such as PositionSearchProblem. Each round expands a
+    whole layer of the smaller frontier; the search stops at the first layer
+    where the two sides meet, so each side only goes about half the depth.
+    Problems without a `goal` fall back to breadthFirstSearch.
+    """
+    from game import Directions
+
+    goal = getattr(problem, 'goal', None)
+    start = problem.getStartState()
+    if goal is None:
+        return breadthFirstSearch(problem)
+    if problem.isGoalState(start):
+        return []
+
+    # ponteiros para o pai de cada lado, e a distância de cada estado à sua origem
+    forward, backward = {start: None}, {goal: None}
+    forwardDepth, backwardDepth = {start: 0}, {goal: 0}
+    forwardLayer, backwardLayer = [start], [goal]
+
+    while forwardLayer and backwardLayer:
+        expandForward = len(forwardLayer) <= len(backwardLayer)
+        if expandForward:
+            layer, parents, depth, otherDepth = forwardLayer, forward, forwardDepth, backwardDepth
+        else:
+            layer, parents, depth, otherDepth = backwardLayer, backward, backwardDepth, forwardDepth
+
+        nextLayer = []
+        meeting, best = None, None
+        for state in layer:
             for successor, action, _ in problem.expand(state):
-                # se o sucessor ainda não foi visitado, adiciona na fila
-                if successor not in visited:
-                    # adiciona o sucessor com o caminho atualizado
-                    frontier.push((successor, path + [action]))
+                if successor in parents:
+                    continue
+                parents[successor] = (state, action)
+                depth[successor] = depth[state] + 1
+                nextLayer.append(successor)
+                # a camada é completada antes de parar: o encontro mais curto pode vir depois
+                if successor in otherDepth:
+                    total = depth[successor] + otherDepth[successor]
+                    if best is None or total < best:
+                        meeting, best = successor, total
+
+        if meeting is not None:
+            # do início ao ponto de encontro, e depois as ações invertidas até o objetivo
+            path = _pathTo(forward, meeting)
+            state = meeting
+            while backward[state] is not None:
+                state, action = backward[state]
+                path.append(Directions.REVERSE[action])
+            problem.isGoalState(goal)  # mantém a marcação do objetivo na exibição
+            return path
+
+        if expandForward:
+            forwardLayer = nextLayer
+        else:
+            backwardLayer = nextLayer
 
     return []
 
@@ -189,50 +299,290 @@ def nullHeuristic(state, problem=None):
 def aStarSearch(problem, heuristic=nullHeuristic):
     """Search the node that has the lowest combined cost and heuristic first."""
     
-    # fila de prioridade usada pelo algoritmo a* (prioriza menor custo total g + h)
-    frontier = util.PriorityQueue()
+    # fila de prioridade indexada (prioriza menor custo total g + h): cada
+    # estado aparece uma única vez, e um caminho mais barato até um estado
+    # que já está na fronteira diminui sua prioridade em vez de duplicá-lo
+    frontier = util.IndexedPriorityQueue()
     start_state = problem.getStartState()
+    # nós da busca (estado, pai, ação, custo g) guardados na arena
+    nodes = SearchNodes()
+    # nó atual de cada estado que está na fronteira
+    open_nodes = {start_state: nodes.add(start_state)}
     
-    # adiciona o estado inicial com caminho vazio e custo zero
+    # adiciona o estado inicial (caminho vazio e custo zero)
     # a prioridade inicial é apenas a heuristica do estado inicial
-    frontier.push((start_state, [], 0), heuristic(start_state, problem))
+    frontier.push(start_state, heuristic(start_state, problem))
     
-    # dicionario
+    # dicionario com o custo dos estados já expandidos
     visited = dict()
     
     # enquanto houver nós na fronteira
     while not frontier.isEmpty():
-        # remove o nó com menor prioridade (menor custo total estimado)
-        state, path, cost = frontier.pop()
-
-        # se este estado já foi visitado com custo menor ou igual, ignora
-        if state in visited and visited[state] <= cost:
-            continue
+        # remove o estado com menor prioridade (menor custo total estimado)
+        state = frontier.pop()
+        node = open_nodes.pop(state)
+        cost = nodes.costs[node]
         
         # registra o custo atual como o menor conhecido para este estado
         visited[state] = cost
 
         # verifica se o estado atual é o objetivo
         if problem.isGoalState(state):
-            return path  # retorna o caminho de ações até o objetivo
+            return nodes.path(node)  # retorna o caminho de ações até o objetivo
         
         # expande o nó atual gerando seus sucessores
         for successor, action, step_cost in problem.expand(state):
             # calcula o novo custo acumulado até o sucessor
             new_cost = cost + step_cost
             
+            if successor in open_nodes:
+                # já está na fronteira: só atualiza se o novo caminho for mais barato
+                if new_cost < nodes.costs[open_nodes[successor]]:
+                    open_nodes[successor] = nodes.add(successor, node, action, new_cost)
+                    frontier.decreaseKey(successor, new_cost + heuristic(successor, problem))
             # se o sucessor ainda não foi visitado ou encontramos um custo menor
-            if successor not in visited or visited[successor] > new_cost:
+            elif successor not in visited or visited[successor] > new_cost:
                 # calcula a prioridade como g(n) + h(n)
                 priority = new_cost + heuristic(successor, problem)
-                # adiciona o sucessor na fronteira com caminho atualizado e nova prioridade
-                frontier.push((successor, path + [action], new_cost), priority)
+                # adiciona o sucessor (filho do nó atual) na fronteira
+                open_nodes[successor] = nodes.add(successor, node, action, new_cost)
+                frontier.push(successor, priority)
 
     # se a fronteira esvaziar sem encontrar solução, retorna caminho vazio
     return []
 
 
+def iterativeDeepeningAStarSearch(problem, heuristic=nullHeuristic, useTable=False, counters=None):
+    """
+    IDA*: a sequence of depth-first searches that cut every node with
+    f = g + h above a bound, starting from h(start) and raising the bound to
+    the smallest f that was cut in the previous iteration. With an admissible
+    heuristic the first goal found is optimal. Memory is only the current
+    path and the successors still to be tried along it, at the cost of
+    expanding the shallow states again in every iteration; states already on
+    the current path are skipped to avoid cycles.
+
+    With useTable=True, a transposition table keeps the cheapest g at which
+    each state was reached in the current iteration, and a state reached
+    again at no smaller cost is pruned. This removes the repeated subtrees of
+    graphs with many transpositions (mazes, the eight puzzle) but takes
+    memory proportional to the states seen, like A*'s closed set.
+
+    If `counters` is a dict it is filled with 'expanded' (calls to expand),
+    'iterations', 'bound' (the last f bound), 'maxDepth' (longest path held)
+    and 'tableSize' (largest transposition table).
+    """
+    stats = counters if counters is not None else {}
+    stats.update(expanded=0, iterations=0, bound=0, maxDepth=0, tableSize=0)
+    inf = float('inf')
+    start = problem.getStartState()
+    if problem.isGoalState(start):
+        return []
+
+    bound = heuristic(start, problem)
+    while bound < inf:
+        stats['iterations'] += 1
+        stats['bound'] = bound
+        # menor f entre os nós cortados: limite da próxima iteração
+        nextBound = inf
+        table = {start: 0} if useTable else None
+        # caminho atual: estados, custos g, ações e os sucessores ainda não tentados de cada nível
+        states, costs, actions = [start], [0], []
+        onPath = {start}
+        successors = [iter(problem.expand(start))]
+        stats['expanded'] += 1
+
+        while successors:
+            step = next(successors[-1], None)
+            if step is None:
+                # todos os sucessores tentados: volta um nível
+                successors.pop()
+                onPath.discard(states.pop())
+                costs.pop()
+                if actions:
+                    actions.pop()
+                continue
+
+            successor, action, stepCost = step
+            if successor in onPath:
+                continue
+            g = costs[-1] + stepCost
+            if table is not None:
+                # já alcançado nesta iteração por um caminho tão barato quanto este
+                if table.get(successor, inf) <= g:
+                    continue
+                table[successor] = g
+            f = g + heuristic(successor, problem)
+            if f > bound:
+                nextBound = min(nextBound, f)
+                continue
+
+            actions.append(action)
+            stats['maxDepth'] = max(stats['maxDepth'], len(actions))
+            if problem.isGoalState(successor):
+                # a tabela da iteração que encontrou o objetivo costuma ser a maior
+                if table is not None:
+                    stats['tableSize'] = max(stats['tableSize'], len(table))
+                return actions
+            states.append(successor)
+            costs.append(g)
+            onPath.add(successor)
+            successors.append(iter(problem.expand(successor)))
+            stats['expanded'] += 1
+
+        if table is not None:
+            stats['tableSize'] = max(stats['tableSize'], len(table))
+        bound = nextBound
+
+    # nenhum nó foi cortado: o espaço de estados acabou sem solução
+    return []
+
+
+class _MemoryNode:
+    """Node of the tree kept in memory by smaStarSearch."""
+    __slots__ = ('state', 'parent', 'action', 'cost', 'f', 'depth',
+                 'children', 'forgotten', 'expanded', 'alive')
+
+    def __init__(self, state, parent, action, cost, f, depth):
+        self.state = state
+        self.parent = parent
+        self.action = action
+        self.cost = cost
+        self.f = f
+        self.depth = depth
+        self.children = {}
+        # menor f entre os filhos esquecidos
+        self.forgotten = float('inf')
+        self.expanded = False
+        self.alive = True
+
+    def openKey(self):
+        """Priority of the node in the frontier: its f, or the best forgotten child once expanded."""
+        return self.forgotten if self.expanded else self.f
+
+    def path(self):
+        path = []
+        node = self
+        while node.parent is not None:
+            path.append(node.action)
+            node = node.parent
+        path.reverse()
+        return path
+
+
+def smaStarSearch(problem, heuristic=nullHeuristic, maxNodes=100000, counters=None):
+    """
+    Simplified memory-bounded A* (SMA*). Behaves like A* (with the best f,
+    deepest node expanded first) until the search tree holds maxNodes nodes;
+    from then on the leaf with the highest f (the shallowest among ties) is
+    dropped, and its f is backed up into its parent, which returns to the
+    frontier and regenerates its forgotten successors when that value becomes
+    the best again. The f of a node is kept as the minimum over its children
+    and forgotten children, so the search still expands in order of f.
+
+    The solution is optimal when the optimal path fits in maxNodes nodes;
+    successors deeper than that are never expanded, and [] is returned if no
+    goal can be reached within the cap. Only states on the path to the root
+    are checked for repetition, so a small cap trades memory for
+    re-expansions.
+
+    If `counters` is a dict it is filled with 'expanded' (calls to expand),
+    'generated', 'forgotten' (dropped leaves), 'regenerated' (expansions of
+    nodes with forgotten children) and 'peakNodes'.
+    """
+    stats = counters if counters is not None else {}
+    stats.update(expanded=0, generated=0, forgotten=0, regenerated=0, peakNodes=1)
+    inf = float('inf')
+    start = problem.getStartState()
+    root = _MemoryNode(start, None, None, 0, heuristic(start, problem), 0)
+    size = 1
+    tieBreak = count()
+    # fronteira: (f, -profundidade, desempate, nó), melhor f e mais profundo primeiro
+    frontier = [(root.f, 0, next(tieBreak), root)]
+    # folhas que podem ser esquecidas: (-f, profundidade, desempate, nó), pior f e mais raso primeiro
+    leaves = []
+
+    while frontier:
+        key, _, _, node = heapq.heappop(frontier)
+        # entradas de nós esquecidos ou com prioridade antiga são ignoradas
+        if not node.alive or key != node.openKey():
+            continue
+        # o melhor nó é infinito: nenhum objetivo cabe no limite de memória
+        if key == inf:
+            break
+
+        if node.expanded:
+            # regera apenas os sucessores esquecidos, com f ao menos o valor guardado
+            stats['regenerated'] += 1
+        elif problem.isGoalState(node.state):
+            return node.path()
+        base = key
+
+        # estados no caminho até a raiz, para não gerar ciclos
+        ancestors = set()
+        ancestor = node
+        while ancestor is not None:
+            ancestors.add(ancestor.state)
+            ancestor = ancestor.parent
+
+        stats['expanded'] += 1
+        depth = node.depth + 1
+        for successor, action, stepCost in problem.expand(node.state):
+            if successor in node.children or successor in ancestors:
+                continue
+            g = node.cost + stepCost
+            if depth >= maxNodes and not problem.isGoalState(successor):
+                # o caminho não cabe na memória passando por este nó
+                f = inf
+            else:
+                # f nunca diminui ao descer na árvore
+                f = max(g + heuristic(successor, problem), base)
+            child = _MemoryNode(successor, node, action, g, f, depth)
+            node.children[successor] = child
+            size += 1
+            stats['generated'] += 1
+            heapq.heappush(frontier, (f, -depth, next(tieBreak), child))
+            heapq.heappush(leaves, (-f, depth, next(tieBreak), child))
+
+        node.expanded = True
+        node.forgotten = inf
+        # propaga o novo f (mínimo dos filhos) em direção à raiz
+        ancestor = node
+        while ancestor is not None:
+            f = min([child.f for child in ancestor.children.values()], default=inf)
+            f = min(f, ancestor.forgotten)
+            if ancestor is not node and f == ancestor.f:
+                break
+            ancestor.f = f
+            ancestor = ancestor.parent
+        if not node.children and node is not root:
+            # beco sem saída: é a primeira folha a ser esquecida
+            heapq.heappush(leaves, (-node.f, node.depth, next(tieBreak), node))
+
+        # esquece as piores folhas até a árvore caber na memória
+        while size > maxNodes and leaves:
+            negF, _, _, leaf = heapq.heappop(leaves)
+            if not leaf.alive or leaf.children or -negF != leaf.f:
+                continue
+            parent = leaf.parent
+            del parent.children[leaf.state]
+            leaf.alive = False
+            size -= 1
+            stats['forgotten'] += 1
+            if leaf.f < parent.forgotten:
+                parent.forgotten = leaf.f
+                heapq.heappush(frontier, (parent.forgotten, -parent.depth, next(tieBreak), parent))
+            if not parent.children and parent is not root:
+                heapq.heappush(leaves, (-parent.f, parent.depth, next(tieBreak), parent))
+        stats['peakNodes'] = max(stats['peakNodes'], size)
+
+    return []
+
+
 # Abbreviations
 bfs = breadthFirstSearch
+bibfs = bidirectionalSearch
 dfs = depthFirstSearch
 astar = aStarSearch
+idastar = iterativeDeepeningAStarSearch
+smastar = smaStarSearch
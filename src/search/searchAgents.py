@@ -37,9 +37,12 @@ Good luck and happy searching!
 from game import Directions
 from game import Agent
 from game import Actions
+from game import Grid
 import util
 import time
 import search
+from collections import OrderedDict
+from mazeDistances import getMazeDistances, UNREACHABLE
 
 class GoWestAgent(Agent):
     "An agent that goes West until it can't."
@@ -133,6 +136,10 @@ class SearchAgent(Agent):
         else:
             return Directions.STOP
 
+def _flag(value):
+    "Agent options arrive as strings from the command line (-a packed=True)"
+    return value in (True, 'True', 'true', '1')
+
 class PositionSearchProblem(search.SearchProblem):
     """
     A search problem defines the state space, start state, goal test, child
@@ -290,12 +297,17 @@ def euclideanHeuristic(position, problem, info={}):
 
 class CornersProblem(search.SearchProblem):
 
-    def __init__(self, startingGameState):
+    def __init__(self, startingGameState, packed=False):
         """
         Inicializa o problema:
         - Armazena as paredes do labirinto
         - Define posição inicial do Pacman
         - Define os cantos do labirinto
+
+        Com packed=True cada estado é um único int: o índice da posição
+        (x * altura + y) deslocado de 4 bits, mais a máscara dos cantos
+        visitados (bit i = self.corners[i]). Use decodeState para obter a
+        tupla (posição, cantos visitados).
         """
         self.walls = startingGameState.getWalls()  # Matriz de paredes
         self.startingPosition = startingGameState.getPacmanPosition()  # Posição inicial do Pacman
@@ -312,18 +324,44 @@ class CornersProblem(search.SearchProblem):
         self._expanded = 0  # Contador de nós expandidos
         self.startingGameState = startingGameState  # Guarda referência do estado do jogo
 
+        # Estados compactos: bit de cada canto na máscara
+        self.packed = packed
+        self.height = self.walls.height
+        self.cornerBits = {corner: 1 << i for i, corner in enumerate(self.corners)}
+
+    def packState(self, position, visitedCorners):
+        """Codifica (posição, cantos visitados) em um int."""
+        x, y = position
+        mask = 0
+        for corner in visitedCorners:
+            mask |= self.cornerBits[corner]
+        return (x * self.height + y) << 4 | mask
+
+    def decodeState(self, state):
+        """Devolve o estado como tupla (posição, cantos visitados), nos dois modos."""
+        if not self.packed:
+            return state
+        position = divmod(state >> 4, self.height)
+        # self.corners já está em ordem crescente
+        visitedCorners = tuple(c for c in self.corners if state & self.cornerBits[c])
+        return (position, visitedCorners)
+
     def getStartState(self):
         """
         Retorna o estado inicial do problema.
         Aqui, o estado é uma tupla:
         (posição atual do Pacman, cantos visitados)
         """
+        if self.packed:
+            return self.packState(self.startingPosition, ())
         return (self.startingPosition, ())  # Nenhum canto visitado no início
 
     def isGoalState(self, state):
         """
         Retorna True se todos os quatro cantos já foram visitados.
         """
+        if self.packed:
+            return state & 15 == 15
         _, visitedCorners = state
         return len(visitedCorners) == 4
 
@@ -334,6 +372,8 @@ class CornersProblem(search.SearchProblem):
         - Atualiza cantos visitados
         - Retorna lista de tuplas (nextState, action, cost)
         """
+        if self.packed:
+            return self._expandPacked(state)
         children = []
         currentPosition, visitedCorners = state
 
@@ -354,6 +394,19 @@ class CornersProblem(search.SearchProblem):
         self._expanded += 1  # Incrementa contador de nós expandidos
         return children
 
+    def _expandPacked(self, state):
+        # Mesmos filhos de expand, com estados compactos
+        children = []
+        x, y = divmod(state >> 4, self.height)
+        mask = state & 15
+        for action in self.getActions(state):
+            nextPosition = self.getNextPosition((x, y), action)
+            nextMask = mask | self.cornerBits.get(nextPosition, 0)
+            index = nextPosition[0] * self.height + nextPosition[1]
+            children.append((index << 4 | nextMask, action, 1))
+        self._expanded += 1
+        return children
+
     def getActions(self, state):
         """
         Retorna todas ações possíveis a partir do estado atual, 
@@ -362,7 +415,7 @@ class CornersProblem(search.SearchProblem):
         possible_directions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
         valid_actions_from_state = []
 
-        x, y = state[0]  # Posição atual
+        x, y = divmod(state >> 4, self.height) if self.packed else state[0]  # Posição atual
         for action in possible_directions:
             dx, dy = Actions.directionToVector(action)  # Converte direção em vetor (dx, dy)
             nextx, nexty = int(x + dx), int(y + dy)
@@ -396,6 +449,11 @@ class CornersProblem(search.SearchProblem):
         - Nova posição do Pacman
         - Atualiza cantos visitados caso chegue em um canto
         """
+        if self.packed:
+            nextPosition = self.getNextPosition(divmod(state >> 4, self.height), action)
+            index = nextPosition[0] * self.height + nextPosition[1]
+            return index << 4 | state & 15 | self.cornerBits.get(nextPosition, 0)
+
         currentPosition, visitedCorners = state
         nextPosition = self.getNextPosition(currentPosition, action)
 
@@ -436,7 +494,8 @@ def cornersHeuristic(state, problem):  #! QUESTAO 5
 
     # position é a posição atual do Pacman (x, y)
     # visitedCorners é a tupla com os cantos já visitados
-    position, visitedCorners = state
+    # (estados compactos são decodificados pelo problema)
+    position, visitedCorners = problem.decodeState(state)
 
     # cria uma lista com os cantos que ainda não foram visitados
     unvisited = [corner for corner in problem.corners if corner not in visitedCorners]
@@ -454,9 +513,11 @@ def cornersHeuristic(state, problem):  #! QUESTAO 5
 
 class AStarCornersAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
-    def __init__(self):
+    def __init__(self, packed=False):
         self.searchFunction = lambda prob: search.aStarSearch(prob, cornersHeuristic)
-        self.searchType = CornersProblem
+        # -a packed=True: estados compactos (ints)
+        packed = _flag(packed)
+        self.searchType = lambda state: CornersProblem(state, packed)
 
 class FoodSearchProblem:
     """
@@ -466,18 +527,43 @@ class FoodSearchProblem:
     A search state in this problem is a tuple ( pacmanPosition, foodGrid ) where
       pacmanPosition: a tuple (x,y) of integers specifying Pacman's position
       foodGrid:       a Grid (see game.py) of either True or False, specifying remaining food
+
+    With packed=True a state is a single int instead: the food Grid's bits
+    shifted left by cellBits, plus the index x * height + y of Pacman's
+    position.  decodeState turns either kind of state into the tuple above.
     """
-    def __init__(self, startingGameState):
+    def __init__(self, startingGameState, packed=False):
         self.start = (startingGameState.getPacmanPosition(), startingGameState.getFood())
         self.walls = startingGameState.getWalls()
         self.startingGameState = startingGameState
         self._expanded = 0 # DO NOT CHANGE
         self.heuristicInfo = {} # A dictionary for the heuristic to store information
 
+        self.packed = packed
+        self.height = self.walls.height
+        self.cellBits = (self.walls.width * self.walls.height).bit_length()
+        self.cellMask = (1 << self.cellBits) - 1
+        if packed:
+            self.start = self.packState(*self.start)
+
+    def packState(self, position, foodGrid):
+        x, y = position
+        return foodGrid.bits << self.cellBits | x * self.height + y
+
+    def decodeState(self, state):
+        "Returns the state as a (pacmanPosition, foodGrid) tuple, in either mode"
+        if not self.packed:
+            return state
+        foodGrid = Grid(self.walls.width, self.walls.height)
+        foodGrid.bits = state >> self.cellBits
+        return (divmod(state & self.cellMask, self.height), foodGrid)
+
     def getStartState(self):
         return self.start
 
     def isGoalState(self, state):
+        if self.packed:
+            return state >> self.cellBits == 0
         return state[1].count() == 0
 
     def expand(self, state):
@@ -493,8 +579,12 @@ class FoodSearchProblem:
     def getActions(self, state):
         possible_directions = [Directions.NORTH, Directions.SOUTH, Directions.EAST, Directions.WEST]
         valid_actions_from_state = []
+        if self.packed:
+            position = divmod(state & self.cellMask, self.height)
+        else:
+            position = state[0]
         for action in possible_directions:
-            x, y = state[0]
+            x, y = position
             dx, dy = Actions.directionToVector(action)
             nextx, nexty = int(x + dx), int(y + dy)
             if not self.walls[nextx][nexty]:
@@ -509,6 +599,12 @@ class FoodSearchProblem:
     def getNextState(self, state, action):
         assert action in self.getActions(state), (
             "Invalid action passed to getActionCost().")
+        if self.packed:
+            x, y = divmod(state & self.cellMask, self.height)
+            dx, dy = Actions.directionToVector(action)
+            index = int(x + dx) * self.height + int(y + dy)
+            food = state >> self.cellBits & ~(1 << index)
+            return food << self.cellBits | index
         x, y = state[0]
         dx, dy = Actions.directionToVector(action)
         nextx, nexty = int(x + dx), int(y + dy)
@@ -519,7 +615,7 @@ class FoodSearchProblem:
     def getCostOfActionSequence(self, actions):
         """Returns the cost of a particular sequence of actions.  If those actions
         include an illegal move, return 999999"""
-        x,y= self.getStartState()[0]
+        x,y= self.startingGameState.getPacmanPosition()
         cost = 0
         for action in actions:
             # figure out the next state and see whether it's legal
@@ -532,18 +628,33 @@ class FoodSearchProblem:
 
 class AStarFoodSearchAgent(SearchAgent):
     "A SearchAgent for FoodSearchProblem using A* and your foodHeuristic"
-    def __init__(self):
+    def __init__(self, packed=False):
         self.searchFunction = lambda prob: search.aStarSearch(prob, foodHeuristic)
-        self.searchType = FoodSearchProblem
+        # -a packed=True: estados compactos (ints)
+        packed = _flag(packed)
+        self.searchType = lambda state: FoodSearchProblem(state, packed)
     
 # Questao 6 - Heurística para FoodSearchProblem
-def foodHeuristic(state, problem): 
+
+# Número máximo de conjuntos de comida com a MST guardada em heuristicInfo
+MST_CACHE_SIZE = 100000
+
+def foodHeuristic(state, problem):
     """
     Heurística para o FoodSearchProblem.
-    Essa solução é mais demorada pois o mazeDistance roda um BFS para cada comida.
+    Distância real até a comida mais próxima mais o custo da árvore geradora
+    mínima (MST) entre as comidas restantes, com as distâncias do oráculo do
+    labirinto (mazeDistances). Para comer tudo, o Pacman precisa chegar a
+    uma comida e depois percorrer um caminho que liga todas as outras, que
+    custa pelo menos a MST; a heurística é admissível e consistente.
+
+    A MST só depende do conjunto de comida, então fica guardada em
+    problem.heuristicInfo (LRU com até MST_CACHE_SIZE conjuntos), indexada
+    pela máscara de bits da grade de comida.
     """
 
-    position, foodGrid = state
+    # (estados compactos são decodificados pelo problema)
+    position, foodGrid = problem.decodeState(state)
 
     # lista de coordenadas da comida que ainda não foi comida
     foodList = foodGrid.asList()
@@ -552,15 +663,44 @@ def foodHeuristic(state, problem):
     if not foodList:
         return 0
 
-    # calcula a maior distância real (mazeDistance) entre a posição atual e qualquer comida
-    # isso é melhor que Manhattan simples, porque leva em conta paredes do labirinto
-    maxDistance = 0
-    for food in foodList:
-        dist = mazeDistance(position, food, problem.startingGameState)
-        if dist > maxDistance:
-            maxDistance = dist
+    info = problem.heuristicInfo
+    if 'mazeDistances' not in info:
+        info['mazeDistances'] = getMazeDistances(problem.walls)
+    if 'spanningTrees' not in info:
+        info['spanningTrees'] = OrderedDict()
+    distances, trees = info['mazeDistances'], info['spanningTrees']
+
+    # custo da MST do conjunto de comida, calculado uma vez por conjunto
+    key = foodGrid.bits
+    treeCost = trees.get(key)
+    if treeCost is None:
+        treeCost = distances.spanningTreeCost(foodList)
+        trees[key] = treeCost
+        if len(trees) > MST_CACHE_SIZE:
+            trees.popitem(last=False)
+    else:
+        trees.move_to_end(key)
+
+    return int(distances.distancesTo(position, foodList).min()) + treeCost
+
+def farthestFoodHeuristic(state, problem):
+    """
+    Heurística anterior do FoodSearchProblem: a maior distância real entre a
+    posição atual e qualquer comida. Mais fraca que foodHeuristic; mantida
+    para comparação (report_food_heuristic.py).
+    """
+    position, foodGrid = problem.decodeState(state)
+    foodList = foodGrid.asList()
+    if not foodList:
+        return 0
+
+    if 'mazeDistances' not in problem.heuristicInfo:
+        problem.heuristicInfo['mazeDistances'] = getMazeDistances(problem.walls)
+    distances = problem.heuristicInfo['mazeDistances']
 
-    return maxDistance
+    # maior distância real (mazeDistance) entre a posição atual e qualquer comida
+    # isso é melhor que Manhattan simples, porque leva em conta paredes do labirinto
+    return int(distances.distancesTo(position, foodList).max())
 
 # Questo 7 - Busca subótima
 class ClosestDotSearchAgent(SearchAgent):
@@ -585,10 +725,18 @@ class ClosestDotSearchAgent(SearchAgent):
         Retorna um caminho (lista de ações) até a comida mais próxima,
         começando a partir de gameState.
         """
-        problem = AnyFoodSearchProblem(gameState)
+        position = gameState.getPacmanPosition()
+        foodList = gameState.getFood().asList()
+        if not foodList:
+            return []
 
-        from search import breadthFirstSearch
-        return breadthFirstSearch(problem)
+        # distâncias a partir da posição atual, pelo oráculo do labirinto
+        distances = getMazeDistances(gameState.getWalls())
+        toFood = distances.distancesTo(position, foodList)
+        closest = int(toFood.argmin())
+        if toFood[closest] == UNREACHABLE:
+            return []
+        return distances.path(position, foodList[closest])
 
 class AnyFoodSearchProblem(PositionSearchProblem):
     """
@@ -626,5 +774,6 @@ def mazeDistance(point1, point2, gameState):
     walls = gameState.getWalls()
     assert not walls[x1][y1], 'point1 is a wall: ' + str(point1)
     assert not walls[x2][y2], 'point2 is a wall: ' + str(point2)
-    prob = PositionSearchProblem(gameState, start=point1, goal=point2, warn=False, visualize=False)
-    return len(search.bfs(prob))
+    # consulta ao oráculo de distâncias do labirinto (um BFS por origem, reaproveitado)
+    distance = getMazeDistances(walls).distance(point1, point2)
+    return 0 if distance == UNREACHABLE else distance
@@ -222,6 +222,105 @@ class PriorityQueueWithFunction(PriorityQueue):
         PriorityQueue.push(self, item, self.priorityFunction(item))
 
 
+class IndexedPriorityQueue:
+    """
+      A binary min-heap that holds each item at most once, with a map from
+      item to its heap position. Lowering the priority of an item already in
+      the queue (decreaseKey) moves it up in O(log n) instead of adding a
+      duplicate entry, so the heap never holds stale entries.
+
+      Items must be hashable. Ties are broken first-in-first-out, and an
+      item whose key is decreased counts as newly inserted, which is the
+      order PriorityQueue gives when the cheaper entry is pushed again.
+    """
+    def  __init__(self):
+        self.heap = []      # entries [priority, count, item]
+        self.position = {}  # item -> index of its entry in self.heap
+        self.count = 0
+
+    def push(self, item, priority):
+        "Adds 'item', which must not be in the queue yet"
+        entry = [priority, self.count, item]
+        self.count += 1
+        self.heap.append(entry)
+        self.position[item] = len(self.heap) - 1
+        self._siftUp(len(self.heap) - 1)
+
+    def pop(self):
+        "Removes and returns the item with the lowest priority"
+        heap = self.heap
+        last = heap.pop()
+        if heap:
+            entry, heap[0] = heap[0], last
+            self.position[last[2]] = 0
+            self._siftDown(0)
+        else:
+            entry = last
+        del self.position[entry[2]]
+        return entry[2]
+
+    def decreaseKey(self, item, priority):
+        "Lowers the priority of an item already in the queue"
+        index = self.position[item]
+        entry = self.heap[index]
+        entry[0] = priority
+        entry[1] = self.count
+        self.count += 1
+        self._siftUp(index)
+
+    def update(self, item, priority):
+        # Same contract as PriorityQueue.update, in O(log n).
+        if item not in self.position:
+            self.push(item, priority)
+        elif priority < self.heap[self.position[item]][0]:
+            self.decreaseKey(item, priority)
+
+    def priority(self, item):
+        return self.heap[self.position[item]][0]
+
+    def isEmpty(self):
+        return len(self.heap) == 0
+
+    def __contains__(self, item):
+        return item in self.position
+
+    def __len__(self):
+        return len(self.heap)
+
+    def _siftUp(self, index):
+        heap, position = self.heap, self.position
+        # counts are unique, so comparing entries never reaches the items
+        entry = heap[index]
+        while index > 0:
+            parentIndex = (index - 1) >> 1
+            parent = heap[parentIndex]
+            if parent < entry:
+                break
+            heap[index] = parent
+            position[parent[2]] = index
+            index = parentIndex
+        heap[index] = entry
+        position[entry[2]] = index
+
+    def _siftDown(self, index):
+        heap, position = self.heap, self.position
+        size = len(heap)
+        entry = heap[index]
+        while True:
+            child = 2 * index + 1
+            if child >= size:
+                break
+            if child + 1 < size and heap[child + 1] < heap[child]:
+                child += 1
+            if entry < heap[child]:
+                break
+            heap[index] = heap[child]
+            position[heap[index][2]] = index
+            index = child
+        heap[index] = entry
+        position[entry[2]] = index
+
+
 def manhattanDistance( xy1, xy2 ):
     "Returns the Manhattan distance between points xy1 and xy2"
     return abs( xy1[0] - xy2[0] ) + abs( xy1[1] - xy2[1] )